@@ -38,7 +38,16 @@ class Config:
     # Similarity Search
     SIMILARITY_THRESHOLD = 0.7
     MAX_SIMILAR_DOCS = 5
+    SIMILARITY_INDEX_DIRECTORY = os.getenv("SIMILARITY_INDEX_DIRECTORY", "./cache")
     
     # Contract Monitoring
     EXPIRATION_ALERT_DAYS = 30
+    
+    # MCP Semantic Cache
+    SEMANTIC_CACHE_THRESHOLD = float(os.getenv("SEMANTIC_CACHE_THRESHOLD", "0.95"))
+    SEMANTIC_CACHE_SIZE = int(os.getenv("SEMANTIC_CACHE_SIZE", "256"))
+    SEMANTIC_CACHE_DIRECTORY = os.getenv("SEMANTIC_CACHE_DIRECTORY", "./cache")
+    
+    # RAG Answer Cache
+    ANSWER_CACHE_SIZE = int(os.getenv("ANSWER_CACHE_SIZE", "1024"))
 
@@ -5,10 +5,13 @@ Handles document loading, chunking, and indexing with ChromaDB.
 import os
 import json
 import hashlib
+import heapq
+from collections import Counter
 from datetime import datetime
 from typing import List, Dict, Any, Optional
 from pathlib import Path
 import re
+from concurrent.futures import ThreadPoolExecutor
 
 # Try to import required libraries
 try:
@@ -59,6 +62,9 @@ class DocumentProcessor:
         # Document registry for tracking
         self.document_registry = {}
         
+        # Bumped whenever the index changes, so callers can drop derived caches
+        self.version = 0
+        
         logger.info("DocumentProcessor initialized successfully")
 
     def _initialize_vector_db(self):
@@ -90,22 +96,26 @@ class DocumentProcessor:
             logger.error(f"Failed to initialize ChromaDB: {e}")
             return MockVectorDB()
 
-    def load_documents(self) -> List[Dict[str, Any]]:
+    def load_documents(self, num_workers: Optional[int] = None) -> List[Dict[str, Any]]:
         """
         Load all documents from the documents directory.
         Returns a list of document dictionaries with content and metadata.
+        Files are read and parsed on num_workers threads (defaults to the CPU count).
         """
         documents = []
+        file_paths = []
         
         # Walk through all subdirectories
         for root, dirs, files in os.walk(self.documents_dir):
             for file in files:
                 if file.endswith(('.txt', '.docx', '.pdf')) and not file.endswith('_metadata.json'):
-                    file_path = os.path.join(root, file)
-                    doc = self._load_single_document(file_path)
-                    if doc:
-                        documents.append(doc)
-                        self.document_registry[doc['id']] = doc
+                    file_paths.append(os.path.join(root, file))
+        
+        with ThreadPoolExecutor(max_workers=num_workers or os.cpu_count() or 1) as executor:
+            for doc in executor.map(self._load_single_document, file_paths):
+                if doc:
+                    documents.append(doc)
+                    self.document_registry[doc['id']] = doc
         
         logger.info(f"Loaded {len(documents)} documents")
         return documents
@@ -300,8 +310,8 @@ class DocumentProcessor:
         
         return chunks
 
-    def index_documents(self, chunks: List[Dict[str, Any]]) -> bool:
-        """Index document chunks in the vector database"""
+    def index_documents(self, chunks: List[Dict[str, Any]], batch_size: int = 64) -> bool:
+        """Index document chunks in the vector database, batch_size chunks per call"""
         try:
             if not chunks:
                 logger.warning("No chunks to index")
@@ -322,18 +332,22 @@ class DocumentProcessor:
                         metadata[key] = str(value) if value is not None else ""
                 metadatas.append(metadata)
             
-            # Add to vector database
-            if hasattr(self.vector_db, 'add'):
-                # ChromaDB
-                self.vector_db.add(
-                    ids=ids,
-                    documents=documents,
-                    metadatas=metadatas
-                )
-            else:
-                # Mock database
-                self.vector_db.add_documents(ids, documents, metadatas)
+            # Add to vector database; each call embeds its whole batch at once
+            batch_size = max(1, batch_size)
+            for start in range(0, len(ids), batch_size):
+                end = start + batch_size
+                if hasattr(self.vector_db, 'add'):
+                    # ChromaDB
+                    self.vector_db.add(
+                        ids=ids[start:end],
+                        documents=documents[start:end],
+                        metadatas=metadatas[start:end]
+                    )
+                else:
+                    # Mock database
+                    self.vector_db.add_documents(ids[start:end], documents[start:end], metadatas[start:end])
             
+            self.version += 1
             logger.info(f"Successfully indexed {len(chunks)} chunks")
             return True
             
@@ -387,13 +401,13 @@ class DocumentProcessor:
         """Get all documents in the registry"""
         return list(self.document_registry.values())
 
-    def process_all_documents(self) -> bool:
+    def process_all_documents(self, batch_size: int = 64, num_workers: Optional[int] = None) -> bool:
         """Complete pipeline: load, chunk, and index all documents"""
         try:
             logger.info("Starting document processing pipeline...")
             
             # Load documents
-            documents = self.load_documents()
+            documents = self.load_documents(num_workers)
             if not documents:
                 logger.error("No documents found to process")
                 return False
@@ -405,7 +419,7 @@ class DocumentProcessor:
                 return False
             
             # Index chunks
-            success = self.index_documents(chunks)
+            success = self.index_documents(chunks, batch_size)
             if not success:
                 logger.error("Failed to index documents")
                 return False
@@ -424,40 +438,50 @@ class MockVectorDB:
     def __init__(self):
         self.documents = {}
         self.embeddings = {}
+        # Inverted index: word -> ids of documents containing it, plus insertion rank for tie-breaking
+        self.postings: Dict[str, set] = {}
+        self.ranks: Dict[str, int] = {}
         logger.info("Using mock vector database")
     
     def add(self, ids, documents, metadatas):
         """Add documents to mock database"""
         for i, doc_id in enumerate(ids):
+            previous = self.documents.get(doc_id)
+            if previous is not None:
+                for word in set(previous['content'].lower().split()):
+                    self.postings[word].discard(doc_id)
+            else:
+                self.ranks[doc_id] = len(self.ranks)
+            
             self.documents[doc_id] = {
                 'content': documents[i],
                 'metadata': metadatas[i]
             }
+            for word in set(documents[i].lower().split()):
+                self.postings.setdefault(word, set()).add(doc_id)
             # Simple mock embedding (just use document length as "embedding")
             self.embeddings[doc_id] = [len(documents[i])]
     
     def query(self, query_texts, n_results):
         """Mock query - returns documents based on simple text matching"""
-        query = query_texts[0].lower()
-        results = []
+        query_words = set(query_texts[0].lower().split())
         
-        for doc_id, doc in self.documents.items():
-            content = doc['content'].lower()
-            # Simple similarity based on word overlap
-            query_words = set(query.split())
-            content_words = set(content.split())
-            similarity = len(query_words.intersection(content_words)) / len(query_words) if query_words else 0
-            
-            if similarity > 0:
-                results.append({
-                    'id': doc_id,
-                    'content': doc['content'],
-                    'metadata': doc['metadata'],
-                    'similarity': similarity
-                })
+        # Simple similarity based on word overlap, counted from the postings of each query word
+        overlap = Counter()
+        for word in query_words:
+            overlap.update(self.postings.get(word, ()))
         
-        # Sort by similarity and return top results
-        results.sort(key=lambda x: x['similarity'], reverse=True)
+        # Highest similarity first, earlier documents first among ties
+        top = heapq.nsmallest(n_results, overlap.items(), key=lambda item: (-item[1], self.ranks[item[0]]))
+        results = [
+            {
+                'id': doc_id,
+                'content': self.documents[doc_id]['content'],
+                'metadata': self.documents[doc_id]['metadata'],
+                'similarity': count / len(query_words)
+            }
+            for doc_id, count in top if count > 0
+        ]
         
         return {
             'ids': [[r['id'] for r in results[:n_results]]],
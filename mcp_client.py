@@ -62,14 +62,22 @@ class CLMMCPClient:
             self.server_process.stdin.write(json.dumps(request) + "\n")
             self.server_process.stdin.flush()
             
-            # Read response
-            response_line = self.server_process.stdout.readline()
-            response = json.loads(response_line.strip())
+            # Read response, collecting any streamed progress chunks that precede it
+            chunks = []
+            while True:
+                response_line = self.server_process.stdout.readline()
+                response = json.loads(response_line.strip())
+                if response.get("method") != "tools/progress":
+                    break
+                chunks.append(response["params"]["chunk"])
             
             if "error" in response:
                 raise Exception(f"MCP Error: {response['error']['message']}")
             
-            return response.get("result", {})
+            result = response.get("result", {})
+            if chunks:
+                result["chunks"] = chunks
+            return result
             
         except Exception as e:
             logging.error(f"Error communicating with MCP server: {e}")
@@ -80,11 +88,15 @@ class CLMMCPClient:
         result = await self._send_request("tools/list")
         return result.get("tools", [])
     
-    async def process_documents(self, force_reprocess: bool = False) -> Dict[str, Any]:
+    async def process_documents(self, force_reprocess: bool = False, batch_size: int = 64,
+                                num_workers: Optional[int] = None) -> Dict[str, Any]:
         """Process contract documents"""
+        arguments = {"force_reprocess": force_reprocess, "batch_size": batch_size}
+        if num_workers is not None:
+            arguments["num_workers"] = num_workers
         return await self._send_request("tools/call", {
             "name": "process_documents",
-            "arguments": {"force_reprocess": force_reprocess}
+            "arguments": arguments
         })
     
     async def ask_question(self, question: str, max_results: int = 5) -> Dict[str, Any]:
@@ -107,13 +119,14 @@ class CLMMCPClient:
             }
         })
     
-    async def search_documents(self, query: str, n_results: int = 5) -> Dict[str, Any]:
+    async def search_documents(self, query: str, n_results: int = 5, stream: bool = False) -> Dict[str, Any]:
         """Search documents by content"""
         return await self._send_request("tools/call", {
             "name": "search_documents",
             "arguments": {
                 "query": query,
-                "n_results": n_results
+                "n_results": n_results,
+                "stream": stream
             }
         })
     
@@ -131,11 +144,11 @@ class CLMMCPClient:
             "arguments": {}
         })
     
-    async def generate_report(self, report_type: str = "comprehensive") -> Dict[str, Any]:
+    async def generate_report(self, report_type: str = "comprehensive", stream: bool = False) -> Dict[str, Any]:
         """Generate a report"""
         return await self._send_request("tools/call", {
             "name": "generate_report",
-            "arguments": {"report_type": report_type}
+            "arguments": {"report_type": report_type, "stream": stream}
         })
     
     async def detect_conflicts(self, conflict_type: str = "all") -> Dict[str, Any]:
@@ -151,6 +164,19 @@ class CLMMCPClient:
             "name": "find_expiring_contracts",
             "arguments": {"days": days}
         })
+    
+    async def batch_execute(self, operations: List[Dict[str, Any]], max_concurrent: int = 4,
+                            stop_on_error: bool = False, timeout_ms: int = 30000) -> Dict[str, Any]:
+        """Run several tool calls concurrently on the server"""
+        return await self._send_request("tools/call", {
+            "name": "batch_execute",
+            "arguments": {
+                "operations": operations,
+                "maxConcurrent": max_concurrent,
+                "stopOnError": stop_on_error,
+                "timeoutMs": timeout_ms
+            }
+        })
 
 
 class CLMAIAgent:
@@ -301,5 +327,15 @@ async def main():
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    # Prefer uvloop's libuv-backed event loop when it is installed
+    try:
+        import uvloop
+    except ImportError:
+        asyncio.run(main())
+    else:
+        if sys.version_info >= (3, 12):
+            asyncio.run(main(), loop_factory=uvloop.new_event_loop)
+        else:
+            uvloop.install()
+            asyncio.run(main())
 
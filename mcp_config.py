@@ -2,9 +2,11 @@
 MCP Configuration for CLM Automation System.
 Defines MCP server settings, tool configurations, and integration parameters.
 """
+import json
 import os
-from typing import Dict, Any, List
-from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Dict, Any, List, Mapping, Sequence, Tuple
+from dataclasses import dataclass, replace
 from enum import Enum
 
 class MCPTransportType(Enum):
@@ -13,9 +15,19 @@ class MCPTransportType(Enum):
     HTTP = "http"
     WEBSOCKET = "websocket"
 
-@dataclass
+# Plain dict lookup avoids the Enum metaclass call path on every parse
+_TRANSPORT_BY_VALUE: Dict[str, MCPTransportType] = {t.value: t for t in MCPTransportType}
+
+def _parse_transport(value: str) -> MCPTransportType:
+    """Transport for a configured value, raising ValueError like MCPTransportType(value) would"""
+    try:
+        return _TRANSPORT_BY_VALUE[value]
+    except (KeyError, TypeError):
+        raise ValueError(f"{value!r} is not a valid {MCPTransportType.__name__}") from None
+
+@dataclass(slots=True, frozen=True)
 class MCPToolConfig:
-    """Configuration for an MCP tool"""
+    """Configuration for an MCP tool (immutable; use dataclasses.replace to change)"""
     name: str
     description: str
     enabled: bool = True
@@ -23,9 +35,9 @@ class MCPToolConfig:
     max_retries: int = 3
     rate_limit: int = 100  # requests per minute
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class MCPServerConfig:
-    """MCP Server configuration"""
+    """MCP Server configuration (immutable; use dataclasses.replace to change)"""
     host: str = "localhost"
     port: int = 8080
     transport: MCPTransportType = MCPTransportType.STDIO
@@ -33,108 +45,142 @@ class MCPServerConfig:
     max_connections: int = 10
     request_timeout: int = 300
     enable_cors: bool = True
-    cors_origins: List[str] = None
+    cors_origins: Sequence[str] = None
+
+# Default tool configurations, shared by every MCPConfig instance
+_TOOL_DEFAULTS: Tuple[MCPToolConfig, ...] = (
+    MCPToolConfig(
+        name="process_documents",
+        description="Process and index contract documents",
+        timeout=600,  # 10 minutes for document processing
+        max_retries=2
+    ),
+    MCPToolConfig(
+        name="ask_question",
+        description="Ask questions about contracts using RAG",
+        timeout=60,  # 1 minute for question answering
+        max_retries=3,
+        rate_limit=50  # Lower rate limit for AI queries
+    ),
+    MCPToolConfig(
+        name="find_similar_documents",
+        description="Find documents similar to a given document",
+        timeout=30,
+        max_retries=3
+    ),
+    MCPToolConfig(
+        name="search_documents",
+        description="Search documents by content",
+        timeout=30,
+        max_retries=3
+    ),
+    MCPToolConfig(
+        name="run_daily_analysis",
+        description="Run daily contract analysis and generate report",
+        timeout=300,  # 5 minutes for daily analysis
+        max_retries=2
+    ),
+    MCPToolConfig(
+        name="get_system_status",
+        description="Get current system status and statistics",
+        timeout=10,
+        max_retries=5,
+        rate_limit=200  # Higher rate limit for status checks
+    ),
+    MCPToolConfig(
+        name="generate_report",
+        description="Generate comprehensive system report",
+        timeout=180,  # 3 minutes for report generation
+        max_retries=2
+    ),
+    MCPToolConfig(
+        name="detect_conflicts",
+        description="Detect conflicts in contract documents",
+        timeout=120,  # 2 minutes for conflict detection
+        max_retries=3
+    ),
+    MCPToolConfig(
+        name="find_expiring_contracts",
+        description="Find contracts expiring within specified days",
+        timeout=60,
+        max_retries=3
+    ),
+    MCPToolConfig(
+        name="batch_execute",
+        description="Run several tool calls concurrently and return all results together",
+        timeout=300,  # Covers the slowest operations in the batch
+        max_retries=1  # Retrying re-runs every operation in the batch
+    )
+)
+
+# Default workflow configurations; copied per instance since they are mutable
+_WORKFLOW_DEFAULTS: Mapping[str, Mapping[str, Any]] = MappingProxyType({
+    "daily_analysis": MappingProxyType({
+        "enabled": True,
+        "schedule": "0 9 * * *",  # Daily at 9 AM
+        "timeout": 1800,  # 30 minutes
+        "retry_on_failure": True,
+        "max_retries": 3
+    }),
+    "document_processing": MappingProxyType({
+        "enabled": True,
+        "trigger": "file_change",  # Triggered by file changes
+        "timeout": 3600,  # 1 hour
+        "retry_on_failure": True,
+        "max_retries": 2
+    }),
+    "contract_analysis": MappingProxyType({
+        "enabled": True,
+        "trigger": "manual",  # Manual trigger only
+        "timeout": 900,  # 15 minutes
+        "retry_on_failure": False,
+        "max_retries": 1
+    })
+})
+
+# Shared default for the CORS/allowed origin lists when no env override is set
+_DEFAULT_ORIGINS: Tuple[str, ...] = ("*",)
+
+# Returned for unknown workflows; read-only so it can be shared safely
+_DISABLED_WORKFLOW: Mapping[str, Any] = MappingProxyType({
+    "enabled": False,
+    "timeout": 300,
+    "retry_on_failure": False,
+    "max_retries": 1
+})
+
+# Returned for unknown tools; frozen, so one disabled placeholder serves every name
+_UNKNOWN_TOOL = MCPToolConfig(name="", description="Unknown tool", enabled=False)
 
 class MCPConfig:
     """Main MCP configuration class"""
     
     def __init__(self):
+        # Read environment variables through one local binding
+        env = os.environ
+        cors_origins = env.get("MCP_CORS_ORIGINS")
+        allowed_origins = env.get("MCP_ALLOWED_ORIGINS")
+        
         # Server configuration
         self.server = MCPServerConfig(
-            host=os.getenv("MCP_HOST", "localhost"),
-            port=int(os.getenv("MCP_PORT", "8080")),
-            transport=MCPTransportType(os.getenv("MCP_TRANSPORT", "stdio")),
-            log_level=os.getenv("MCP_LOG_LEVEL", "INFO"),
-            max_connections=int(os.getenv("MCP_MAX_CONNECTIONS", "10")),
-            request_timeout=int(os.getenv("MCP_REQUEST_TIMEOUT", "300")),
-            enable_cors=os.getenv("MCP_ENABLE_CORS", "true").lower() == "true",
-            cors_origins=os.getenv("MCP_CORS_ORIGINS", "*").split(",")
+            host=env.get("MCP_HOST", "localhost"),
+            port=int(env.get("MCP_PORT", "8080")),
+            transport=_parse_transport(env.get("MCP_TRANSPORT", "stdio")),
+            log_level=env.get("MCP_LOG_LEVEL", "INFO"),
+            max_connections=int(env.get("MCP_MAX_CONNECTIONS", "10")),
+            request_timeout=int(env.get("MCP_REQUEST_TIMEOUT", "300")),
+            enable_cors=env.get("MCP_ENABLE_CORS", "true").lower() == "true",
+            cors_origins=cors_origins.split(",") if cors_origins is not None else _DEFAULT_ORIGINS
         )
         
-        # Tool configurations
-        self.tools = {
-            "process_documents": MCPToolConfig(
-                name="process_documents",
-                description="Process and index contract documents",
-                timeout=600,  # 10 minutes for document processing
-                max_retries=2
-            ),
-            "ask_question": MCPToolConfig(
-                name="ask_question",
-                description="Ask questions about contracts using RAG",
-                timeout=60,  # 1 minute for question answering
-                max_retries=3,
-                rate_limit=50  # Lower rate limit for AI queries
-            ),
-            "find_similar_documents": MCPToolConfig(
-                name="find_similar_documents",
-                description="Find documents similar to a given document",
-                timeout=30,
-                max_retries=3
-            ),
-            "search_documents": MCPToolConfig(
-                name="search_documents",
-                description="Search documents by content",
-                timeout=30,
-                max_retries=3
-            ),
-            "run_daily_analysis": MCPToolConfig(
-                name="run_daily_analysis",
-                description="Run daily contract analysis and generate report",
-                timeout=300,  # 5 minutes for daily analysis
-                max_retries=2
-            ),
-            "get_system_status": MCPToolConfig(
-                name="get_system_status",
-                description="Get current system status and statistics",
-                timeout=10,
-                max_retries=5,
-                rate_limit=200  # Higher rate limit for status checks
-            ),
-            "generate_report": MCPToolConfig(
-                name="generate_report",
-                description="Generate comprehensive system report",
-                timeout=180,  # 3 minutes for report generation
-                max_retries=2
-            ),
-            "detect_conflicts": MCPToolConfig(
-                name="detect_conflicts",
-                description="Detect conflicts in contract documents",
-                timeout=120,  # 2 minutes for conflict detection
-                max_retries=3
-            ),
-            "find_expiring_contracts": MCPToolConfig(
-                name="find_expiring_contracts",
-                description="Find contracts expiring within specified days",
-                timeout=60,
-                max_retries=3
-            )
-        }
+        # Tool configurations (frozen, so the defaults are shared)
+        self.tools = {tool.name: tool for tool in _TOOL_DEFAULTS}
+        
+        # Serialized server/tools sections, reused by to_dict until replaced
+        self._dict_cache = None
         
         # Workflow configurations
-        self.workflows = {
-            "daily_analysis": {
-                "enabled": True,
-                "schedule": "0 9 * * *",  # Daily at 9 AM
-                "timeout": 1800,  # 30 minutes
-                "retry_on_failure": True,
-                "max_retries": 3
-            },
-            "document_processing": {
-                "enabled": True,
-                "trigger": "file_change",  # Triggered by file changes
-                "timeout": 3600,  # 1 hour
-                "retry_on_failure": True,
-                "max_retries": 2
-            },
-            "contract_analysis": {
-                "enabled": True,
-                "trigger": "manual",  # Manual trigger only
-                "timeout": 900,  # 15 minutes
-                "retry_on_failure": False,
-                "max_retries": 1
-            }
-        }
+        self.workflows = {name: dict(workflow) for name, workflow in _WORKFLOW_DEFAULTS.items()}
         
         # AI Agent configurations
         self.ai_agent = {
@@ -162,9 +208,9 @@ class MCPConfig:
         
         # Security configurations
         self.security = {
-            "enable_authentication": os.getenv("MCP_ENABLE_AUTH", "false").lower() == "true",
-            "api_key": os.getenv("MCP_API_KEY", ""),
-            "allowed_origins": os.getenv("MCP_ALLOWED_ORIGINS", "*").split(","),
+            "enable_authentication": env.get("MCP_ENABLE_AUTH", "false").lower() == "true",
+            "api_key": env.get("MCP_API_KEY", ""),
+            "allowed_origins": allowed_origins.split(",") if allowed_origins is not None else _DEFAULT_ORIGINS,
             "rate_limiting": {
                 "enabled": True,
                 "requests_per_minute": 100,
@@ -174,45 +220,47 @@ class MCPConfig:
     
     def get_tool_config(self, tool_name: str) -> MCPToolConfig:
         """Get configuration for a specific tool"""
-        return self.tools.get(tool_name, MCPToolConfig(
-            name=tool_name,
-            description="Unknown tool",
-            enabled=False
-        ))
+        return self.tools.get(tool_name, _UNKNOWN_TOOL)
     
     def is_tool_enabled(self, tool_name: str) -> bool:
         """Check if a tool is enabled"""
-        tool_config = self.get_tool_config(tool_name)
-        return tool_config.enabled
+        tool_config = self.tools.get(tool_name)
+        return tool_config is not None and tool_config.enabled
     
-    def get_workflow_config(self, workflow_name: str) -> Dict[str, Any]:
+    def get_workflow_config(self, workflow_name: str) -> Mapping[str, Any]:
         """Get configuration for a specific workflow"""
-        return self.workflows.get(workflow_name, {
-            "enabled": False,
-            "timeout": 300,
-            "retry_on_failure": False,
-            "max_retries": 1
-        })
+        return self.workflows.get(workflow_name, _DISABLED_WORKFLOW)
     
     def is_workflow_enabled(self, workflow_name: str) -> bool:
         """Check if a workflow is enabled"""
-        workflow_config = self.get_workflow_config(workflow_name)
-        return workflow_config.get("enabled", False)
+        workflow_config = self.workflows.get(workflow_name)
+        return workflow_config is not None and workflow_config.get("enabled", False)
     
     def to_dict(self) -> Dict[str, Any]:
-        """Convert configuration to dictionary"""
-        return {
-            "server": {
-                "host": self.server.host,
-                "port": self.server.port,
-                "transport": self.server.transport.value,
-                "log_level": self.server.log_level,
-                "max_connections": self.server.max_connections,
-                "request_timeout": self.server.request_timeout,
-                "enable_cors": self.server.enable_cors,
-                "cors_origins": self.server.cors_origins
-            },
-            "tools": {
+        """Convert configuration to dictionary.
+        
+        The returned sections are shared with the configuration and later
+        calls, so treat them as read-only.
+        """
+        # Server and tool configs are frozen, so their serialized form can only
+        # go stale when an entry is replaced; the identity check catches that
+        server = self.server
+        tool_items = tuple(self.tools.items())
+        cache = self._dict_cache
+        if cache is None or cache[0] is not server or cache[1] != tool_items:
+            # Explicit field copies are much cheaper than dataclasses.asdict,
+            # which deep-copies every value recursively
+            server_dict = {
+                "host": server.host,
+                "port": server.port,
+                "transport": server.transport.value,
+                "log_level": server.log_level,
+                "max_connections": server.max_connections,
+                "request_timeout": server.request_timeout,
+                "enable_cors": server.enable_cors,
+                "cors_origins": server.cors_origins
+            }
+            tools_dict = {
                 name: {
                     "name": config.name,
                     "description": config.description,
@@ -221,8 +269,13 @@ class MCPConfig:
                     "max_retries": config.max_retries,
                     "rate_limit": config.rate_limit
                 }
-                for name, config in self.tools.items()
-            },
+                for name, config in tool_items
+            }
+            cache = self._dict_cache = (server, tool_items, server_dict, tools_dict)
+        
+        return {
+            "server": cache[2],
+            "tools": cache[3],
             "workflows": self.workflows,
             "ai_agent": self.ai_agent,
             "monitoring": self.monitoring,
@@ -232,7 +285,6 @@ class MCPConfig:
     def save_to_file(self, filepath: str) -> bool:
         """Save configuration to file"""
         try:
-            import json
             with open(filepath, 'w') as f:
                 json.dump(self.to_dict(), f, indent=2)
             return True
@@ -244,7 +296,6 @@ class MCPConfig:
     def load_from_file(cls, filepath: str) -> 'MCPConfig':
         """Load configuration from file"""
         try:
-            import json
             with open(filepath, 'r') as f:
                 config_dict = json.load(f)
             
@@ -253,23 +304,34 @@ class MCPConfig:
             # Update server config
             if "server" in config_dict:
                 server_config = config_dict["server"]
-                config.server.host = server_config.get("host", config.server.host)
-                config.server.port = server_config.get("port", config.server.port)
-                config.server.transport = MCPTransportType(server_config.get("transport", config.server.transport.value))
-                config.server.log_level = server_config.get("log_level", config.server.log_level)
-                config.server.max_connections = server_config.get("max_connections", config.server.max_connections)
-                config.server.request_timeout = server_config.get("request_timeout", config.server.request_timeout)
-                config.server.enable_cors = server_config.get("enable_cors", config.server.enable_cors)
-                config.server.cors_origins = server_config.get("cors_origins", config.server.cors_origins)
+                server = config.server
+                config.server = replace(
+                    server,
+                    host=server_config.get("host", server.host),
+                    port=server_config.get("port", server.port),
+                    transport=_parse_transport(server_config.get("transport", server.transport.value)),
+                    log_level=server_config.get("log_level", server.log_level),
+                    max_connections=server_config.get("max_connections", server.max_connections),
+                    request_timeout=server_config.get("request_timeout", server.request_timeout),
+                    enable_cors=server_config.get("enable_cors", server.enable_cors),
+                    cors_origins=server_config.get("cors_origins", server.cors_origins)
+                )
             
             # Update tool configs
             if "tools" in config_dict:
+                tools = config.tools
                 for tool_name, tool_config in config_dict["tools"].items():
-                    if tool_name in config.tools:
-                        config.tools[tool_name].enabled = tool_config.get("enabled", config.tools[tool_name].enabled)
-                        config.tools[tool_name].timeout = tool_config.get("timeout", config.tools[tool_name].timeout)
-                        config.tools[tool_name].max_retries = tool_config.get("max_retries", config.tools[tool_name].max_retries)
-                        config.tools[tool_name].rate_limit = tool_config.get("rate_limit", config.tools[tool_name].rate_limit)
+                    existing = tools.get(tool_name)
+                    if existing is None:
+                        continue
+                    get = tool_config.get
+                    tools[tool_name] = replace(
+                        existing,
+                        enabled=get("enabled", existing.enabled),
+                        timeout=get("timeout", existing.timeout),
+                        max_retries=get("max_retries", existing.max_retries),
+                        rate_limit=get("rate_limit", existing.rate_limit)
+                    )
             
             # Update workflow configs
             if "workflows" in config_dict:
@@ -293,8 +355,17 @@ class MCPConfig:
             print(f"Error loading MCP configuration: {e}")
             return cls()  # Return default config
 
-# Default MCP configuration
-DEFAULT_MCP_CONFIG = MCPConfig()
+# Default MCP configuration (built on first access of DEFAULT_MCP_CONFIG)
+_default_mcp_config = None
+
+def __getattr__(name: str) -> Any:
+    """Lazily construct module-level defaults (PEP 562)"""
+    global _default_mcp_config
+    if name == "DEFAULT_MCP_CONFIG":
+        if _default_mcp_config is None:
+            _default_mcp_config = MCPConfig()
+        return _default_mcp_config
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 # Environment variable mappings
 MCP_ENV_VARS = {
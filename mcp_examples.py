@@ -7,9 +7,11 @@ import json
 from datetime import datetime, timedelta
 from typing import Dict, Any, List
 
-from mcp_integration import CLMAutomationOrchestrator
-from mcp_client import CLMMCPClient, CLMAIAgent
-from mcp_config import MCPConfig
+_BAR = "=" * 60
+
+def _banner(title: str) -> str:
+    """Section banner printed before each example"""
+    return f"\n{_BAR}\n{title}\n{_BAR}"
 
 class MCPExamples:
     """Collection of MCP integration examples"""
@@ -21,6 +23,10 @@ class MCPExamples:
     
     async def initialize(self):
         """Initialize MCP components"""
+        # Imported here so loading the examples module stays lightweight
+        from mcp_integration import CLMAutomationOrchestrator
+        from mcp_client import CLMMCPClient, CLMAIAgent
+        
         self.orchestrator = CLMAutomationOrchestrator()
         await self.orchestrator.initialize()
         
@@ -41,9 +47,7 @@ class MCPExamples:
     
     async def example_1_basic_question_answering(self):
         """Example 1: Basic question answering using MCP"""
-        print("\n" + "="*60)
-        print("EXAMPLE 1: Basic Question Answering")
-        print("="*60)
+        print(_banner("EXAMPLE 1: Basic Question Answering"))
         
         questions = [
             "What contracts are expiring soon?",
@@ -52,12 +56,15 @@ class MCPExamples:
             "What are the financial terms of our contracts?"
         ]
         
-        for question in questions:
+        # The questions are independent, so issue them concurrently
+        results = await asyncio.gather(
+            *(self.mcp_client.ask_question(question) for question in questions)
+        )
+        
+        for question, result in zip(questions, results):
             print(f"\nQuestion: {question}")
             print("-" * 40)
             
-            result = await self.mcp_client.ask_question(question)
-            
             if "error" in result:
                 print(f"Error: {result['error']}")
             else:
@@ -67,9 +74,7 @@ class MCPExamples:
     
     async def example_2_document_analysis(self):
         """Example 2: Document analysis and similarity detection"""
-        print("\n" + "="*60)
-        print("EXAMPLE 2: Document Analysis")
-        print("="*60)
+        print(_banner("EXAMPLE 2: Document Analysis"))
         
         # Search for documents
         search_query = "service agreement"
@@ -79,11 +84,13 @@ class MCPExamples:
         if "error" not in search_results:
             print(f"Found {search_results.get('count', 0)} documents")
             for i, doc in enumerate(search_results.get('results', [])[:3], 1):
-                print(f"{i}. {doc.get('file_name', 'Unknown')} (similarity: {doc.get('similarity_score', 0):.3f})")
+                get = doc.get
+                print(f"{i}. {get('file_name', 'Unknown')} (similarity: {get('similarity_score', 0):.3f})")
         
         # Find similar documents (if we have a document ID)
-        if search_results.get('results'):
-            first_doc = search_results['results'][0]
+        results = search_results.get('results')
+        if results:
+            first_doc = results[0]
             doc_id = first_doc.get('id', '')
             if doc_id:
                 print(f"\nFinding documents similar to: {first_doc.get('file_name', 'Unknown')}")
@@ -92,13 +99,12 @@ class MCPExamples:
                 if "error" not in similar_results:
                     print(f"Found {similar_results.get('count', 0)} similar documents")
                     for i, doc in enumerate(similar_results.get('similar_documents', [])[:3], 1):
-                        print(f"{i}. {doc.get('file_name', 'Unknown')} (similarity: {doc.get('similarity_score', 0):.3f})")
+                        get = doc.get
+                        print(f"{i}. {get('file_name', 'Unknown')} (similarity: {get('similarity_score', 0):.3f})")
     
     async def example_3_automated_workflows(self):
         """Example 3: Automated workflow execution"""
-        print("\n" + "="*60)
-        print("EXAMPLE 3: Automated Workflows")
-        print("="*60)
+        print(_banner("EXAMPLE 3: Automated Workflows"))
         
         # Run daily analysis workflow
         print("\nRunning daily analysis workflow...")
@@ -108,10 +114,13 @@ class MCPExamples:
             print(f"Error: {daily_result['error']}")
         else:
             workflow_result = daily_result.get('workflow_result', {})
-            print(f"Workflow Status: {workflow_result.get('status', 'Unknown')}")
-            print(f"Steps Completed: {workflow_result.get('steps_completed', 0)}/{workflow_result.get('total_steps', 0)}")
+            status = workflow_result.get('status')
+            steps_completed = workflow_result.get('steps_completed', 0)
+            total_steps = workflow_result.get('total_steps', 0)
+            print(f"Workflow Status: {status or 'Unknown'}")
+            print(f"Steps Completed: {steps_completed}/{total_steps}")
             
-            if workflow_result.get('status') == 'completed':
+            if status == 'completed':
                 print("✅ Daily analysis workflow completed successfully")
             else:
                 print(f"❌ Workflow failed: {workflow_result.get('error', 'Unknown error')}")
@@ -124,32 +133,32 @@ class MCPExamples:
             print(f"Error: {processing_result['error']}")
         else:
             workflow_result = processing_result.get('workflow_result', {})
-            print(f"Workflow Status: {workflow_result.get('status', 'Unknown')}")
+            status = workflow_result.get('status')
+            print(f"Workflow Status: {status or 'Unknown'}")
             
-            if workflow_result.get('status') == 'completed':
+            if status == 'completed':
                 print("✅ Document processing workflow completed successfully")
             else:
                 print(f"❌ Workflow failed: {workflow_result.get('error', 'Unknown error')}")
     
     async def example_4_ai_agent_automation(self):
         """Example 4: AI Agent automation capabilities"""
-        print("\n" + "="*60)
-        print("EXAMPLE 4: AI Agent Automation")
-        print("="*60)
+        print(_banner("EXAMPLE 4: AI Agent Automation"))
         
-        # Contract analysis
-        print("\nRunning contract analysis...")
-        analysis_result = await self.orchestrator.analyze_contracts("conflicts")
+        # Conflict and expiration analyses share no state, so run them together
+        print("\nRunning contract and expiring contracts analysis...")
+        analysis_result, expiring_result = await asyncio.gather(
+            self.orchestrator.analyze_contracts("conflicts"),
+            self.orchestrator.analyze_contracts("expiring")
+        )
         
+        # Contract analysis
         if "error" in analysis_result:
             print(f"Error: {analysis_result['error']}")
         else:
             print(f"Analysis completed: {analysis_result.get('count', 0)} conflicts found")
         
         # Expiring contracts analysis
-        print("\nAnalyzing expiring contracts...")
-        expiring_result = await self.orchestrator.analyze_contracts("expiring")
-        
         if "error" in expiring_result:
             print(f"Error: {expiring_result['error']}")
         else:
@@ -157,14 +166,16 @@ class MCPExamples:
     
     async def example_5_system_monitoring(self):
         """Example 5: System monitoring and status"""
-        print("\n" + "="*60)
-        print("EXAMPLE 5: System Monitoring")
-        print("="*60)
+        print(_banner("EXAMPLE 5: System Monitoring"))
         
-        # Get system status
-        print("\nGetting system status...")
-        status = await self.mcp_client.get_system_status()
+        # Status and report requests are independent
+        print("\nGetting system status and generating comprehensive report...")
+        status, report = await asyncio.gather(
+            self.mcp_client.get_system_status(),
+            self.mcp_client.generate_report("comprehensive")
+        )
         
+        # System status
         if "error" in status:
             print(f"Error: {status['error']}")
         else:
@@ -174,25 +185,21 @@ class MCPExamples:
             print(f"Conflicts Detected: {status.get('conflicts_detected', 0)}")
             print(f"Last Updated: {status.get('last_updated', 'Unknown')}")
         
-        # Generate comprehensive report
-        print("\nGenerating comprehensive report...")
-        report = await self.mcp_client.generate_report("comprehensive")
-        
+        # Comprehensive report
         if "error" in report:
             print(f"Error: {report['error']}")
         else:
             print("✅ Comprehensive report generated successfully")
             report_data = report.get('report', {})
             if isinstance(report_data, dict):
+                daily_analysis = report_data.get('daily_analysis', {})
                 print(f"Report includes:")
-                print(f"  - Daily analysis: {len(report_data.get('daily_analysis', {}).get('expiring_contracts', []))} expiring contracts")
-                print(f"  - Conflicts: {len(report_data.get('daily_analysis', {}).get('conflicts', []))} detected")
+                print(f"  - Daily analysis: {len(daily_analysis.get('expiring_contracts', []))} expiring contracts")
+                print(f"  - Conflicts: {len(daily_analysis.get('conflicts', []))} detected")
     
     async def example_6_custom_workflow(self):
         """Example 6: Creating and running custom workflows"""
-        print("\n" + "="*60)
-        print("EXAMPLE 6: Custom Workflows")
-        print("="*60)
+        print(_banner("EXAMPLE 6: Custom Workflows"))
         
         from mcp_integration import WorkflowStep, CLMWorkflowEngine
         
@@ -238,9 +245,7 @@ class MCPExamples:
     
     async def example_7_error_handling(self):
         """Example 7: Error handling and resilience"""
-        print("\n" + "="*60)
-        print("EXAMPLE 7: Error Handling")
-        print("="*60)
+        print(_banner("EXAMPLE 7: Error Handling"))
         
         # Test with invalid parameters
         print("\nTesting error handling with invalid parameters...")
@@ -276,7 +281,7 @@ class MCPExamples:
     async def run_all_examples(self):
         """Run all MCP examples"""
         print("🚀 CLM MCP Integration Examples")
-        print("=" * 60)
+        print(_BAR)
         
         try:
             await self.initialize()
@@ -291,9 +296,7 @@ class MCPExamples:
             await self.example_6_custom_workflow()
             await self.example_7_error_handling()
             
-            print("\n" + "="*60)
-            print("✅ All examples completed successfully!")
-            print("="*60)
+            print(_banner("✅ All examples completed successfully!"))
             
         except Exception as e:
             print(f"❌ Error running examples: {e}")
@@ -304,9 +307,9 @@ class MCPExamples:
 # Configuration examples
 def example_configuration():
     """Example of MCP configuration"""
-    print("\n" + "="*60)
-    print("MCP CONFIGURATION EXAMPLES")
-    print("="*60)
+    from mcp_config import MCPConfig
+    
+    print(_banner("MCP CONFIGURATION EXAMPLES"))
     
     # Create default configuration
     config = MCPConfig()
@@ -335,7 +338,7 @@ def example_configuration():
 async def main():
     """Main execution function"""
     print("CLM MCP Integration Examples")
-    print("=" * 60)
+    print(_BAR)
     
     # Run configuration examples
     example_configuration()
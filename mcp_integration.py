@@ -5,13 +5,23 @@ Provides enhanced AI agent capabilities and workflow automation.
 import asyncio
 import json
 import logging
-from typing import Any, Dict, List, Optional, Callable
+import os
+import random
+import sys
+import time
+from typing import Any, Awaitable, Dict, List, Optional, Callable, Tuple, Type
 from datetime import datetime, timedelta
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from enum import Enum
+from graphlib import CycleError, TopologicalSorter
 
 from mcp_client import CLMMCPClient, CLMAIAgent
 
+logger = logging.getLogger(__name__)
+
+# Error returned for calls made before initialize()
+_NOT_INIT_MESSAGE = "Orchestrator not initialized"
+
 class WorkflowStatus(Enum):
     """Workflow execution status"""
     PENDING = "pending"
@@ -29,19 +39,63 @@ class WorkflowStep:
     retry_count: int = 0
     max_retries: int = 3
     timeout: int = 300  # 5 minutes
-    depends_on: List[str] = None  # Step dependencies
+    depends_on: List[str] = None  # Step dependencies (stored as a frozenset once registered)
+    backoff_base: float = 0.1  # Minimum retry delay in seconds
+    backoff_cap: float = 30.0  # Maximum retry delay in seconds
+    # Only these errors are retried; anything else (TypeError, KeyError, ...) fails immediately
+    retry_on: Tuple[Type[BaseException], ...] = (asyncio.TimeoutError, ConnectionError, OSError)
 
-@dataclass
+@dataclass(slots=True, frozen=True)
+class StepOutcome:
+    """Outcome of a single workflow step"""
+    success: bool
+    result: Any
+    error: Optional[str]
+    attempt: int
+    timestamp_ns: int  # Wall-clock time.time_ns() when the step finished
+
+@dataclass(slots=True)
 class WorkflowResult:
     """Result of workflow execution"""
     workflow_id: str
     status: WorkflowStatus
-    start_time: datetime
-    end_time: Optional[datetime] = None
+    start_ns: int  # time.monotonic_ns() when execution started
+    end_ns: Optional[int] = None
     steps_completed: int = 0
     total_steps: int = 0
-    results: Dict[str, Any] = None
+    results: Dict[str, StepOutcome] = None
     error: Optional[str] = None
+    started_at: datetime = field(default_factory=datetime.now)  # Wall clock, for display only
+    
+    @property
+    def duration_s(self) -> Optional[float]:
+        """Elapsed execution time in seconds, once the workflow has finished"""
+        if self.end_ns is None:
+            return None
+        return (self.end_ns - self.start_ns) / 1e9
+    
+    def _finalize(self, status: WorkflowStatus, error: Optional[str] = None):
+        """Record the terminal status and stop the clock"""
+        self.status = status
+        self.end_ns = time.monotonic_ns()
+        self.error = error
+
+class _RunningScope:
+    """Keeps a workflow listed in running_workflows while it executes"""
+    
+    __slots__ = ("running", "workflow_id", "result")
+    
+    def __init__(self, running: Dict[str, WorkflowResult], workflow_id: str, result: WorkflowResult):
+        self.running = running
+        self.workflow_id = workflow_id
+        self.result = result
+    
+    async def __aenter__(self) -> WorkflowResult:
+        self.running[self.workflow_id] = self.result
+        return self.result
+    
+    async def __aexit__(self, exc_type, exc, tb):
+        self.running.pop(self.workflow_id, None)
 
 class CLMWorkflowEngine:
     """
@@ -49,34 +103,54 @@ class CLMWorkflowEngine:
     Enables complex multi-step automation workflows.
     """
     
-    def __init__(self, mcp_client: CLMMCPClient):
+    def __init__(self, mcp_client: CLMMCPClient, max_concurrency: Optional[int] = None):
         self.mcp_client = mcp_client
+        # Caps in-flight step calls so wide workflows don't flood the MCP client
+        self.max_concurrency = max_concurrency or min(32, (os.cpu_count() or 1) * 4)
+        self._step_semaphore = asyncio.Semaphore(self.max_concurrency)
         self.workflows = {}
         self.running_workflows = {}
+        self.registered_workflow_ids: Tuple[str, ...] = ()  # Rebuilt only on registration
         
     def register_workflow(self, workflow_id: str, steps: List[WorkflowStep]) -> bool:
         """Register a new workflow"""
         try:
+            # Names are reused as dict keys on every run; interned keys compare by identity
+            workflow_id = sys.intern(workflow_id)
+            for step in steps:
+                step.name = sys.intern(step.name)
+                step.depends_on = frozenset(sys.intern(dep) for dep in step.depends_on or ())
+            
+            # Index steps and their dependencies once so executions don't rebuild them
+            steps_by_name = {step.name: step for step in steps}
+            if workflow_id not in self.workflows:
+                self.registered_workflow_ids += (workflow_id,)
             self.workflows[workflow_id] = {
                 "steps": steps,
+                "steps_by_name": steps_by_name,
+                "dependencies": {step.name: step.depends_on for step in steps},
+                "missing_dependencies": sorted(
+                    dep for step in steps for dep in step.depends_on if dep not in steps_by_name
+                ),
                 "created_at": datetime.now(),
                 "status": WorkflowStatus.PENDING
             }
-            logging.info(f"Workflow '{workflow_id}' registered with {len(steps)} steps")
+            logger.info("Workflow '%s' registered with %d steps", workflow_id, len(steps))
             return True
         except Exception as e:
-            logging.error(f"Error registering workflow '{workflow_id}': {e}")
+            logger.error("Error registering workflow '%s': %s", workflow_id, e)
             return False
     
     async def execute_workflow(self, workflow_id: str, parameters: Dict[str, Any] = None) -> WorkflowResult:
         """Execute a registered workflow"""
         if workflow_id not in self.workflows:
-            return WorkflowResult(
+            result = WorkflowResult(
                 workflow_id=workflow_id,
-                status=WorkflowStatus.FAILED,
-                start_time=datetime.now(),
-                error=f"Workflow '{workflow_id}' not found"
+                status=WorkflowStatus.PENDING,
+                start_ns=time.monotonic_ns()
             )
+            result._finalize(WorkflowStatus.FAILED, f"Workflow '{workflow_id}' not found")
+            return result
         
         workflow = self.workflows[workflow_id]
         steps = workflow["steps"]
@@ -84,88 +158,161 @@ class CLMWorkflowEngine:
         result = WorkflowResult(
             workflow_id=workflow_id,
             status=WorkflowStatus.RUNNING,
-            start_time=datetime.now(),
+            start_ns=time.monotonic_ns(),
             total_steps=len(steps),
             results={}
         )
         
-        self.running_workflows[workflow_id] = result
+        async with _RunningScope(self.running_workflows, workflow_id, result):
+            try:
+                # Run each step as soon as its dependencies have completed
+                error = await self._execute_steps_parallel(workflow, parameters or {}, result)
+            except CycleError:
+                logger.warning("Workflow '%s' has cyclic dependencies, running steps in order", workflow_id)
+                error = await self._execute_steps_serial(steps, parameters or {}, result)
+            
+            if error is None:
+                result._finalize(WorkflowStatus.COMPLETED)
+                logger.info("Workflow '%s' completed successfully", workflow_id)
+            else:
+                result._finalize(WorkflowStatus.FAILED, error)
+                logger.error("Workflow '%s' failed: %s", workflow_id, error)
         
-        try:
-            # Execute steps in order
-            for i, step in enumerate(steps):
-                logging.info(f"Executing step {i+1}/{len(steps)}: {step.name}")
+        return result
+    
+    async def _execute_steps_parallel(self, workflow: Dict[str, Any], workflow_params: Dict[str, Any],
+                                      result: WorkflowResult) -> Optional[str]:
+        """
+        Execute steps as a dependency graph, running independent steps concurrently.
+        Returns the failure message, or None if every step completed.
+        """
+        if workflow["missing_dependencies"]:
+            return f"Dependency '{workflow['missing_dependencies'][0]}' not completed"
+        
+        steps = workflow["steps"]
+        steps_by_name = workflow["steps_by_name"]
+        sorter = TopologicalSorter(workflow["dependencies"])
+        sorter.prepare()  # Raises CycleError before any step has started
+        
+        running = {}
+        started = 0
+        failure = None
+        log_steps = logger.isEnabledFor(logging.INFO)
+        # The task group cancels in-flight steps if the workflow itself is cancelled
+        async with asyncio.TaskGroup() as task_group:
+            while sorter.is_active():
+                for name in sorter.get_ready():
+                    started += 1
+                    if log_steps:
+                        logger.info("Executing step %d/%d: %s", started, len(steps), name)
+                    task = task_group.create_task(self._execute_step(steps_by_name[name], workflow_params))
+                    running[task] = name
                 
-                # Check dependencies
-                if step.depends_on:
-                    for dep in step.depends_on:
-                        if dep not in result.results:
-                            raise Exception(f"Dependency '{dep}' not completed")
+                done, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
                 
-                # Execute step with retry logic
-                step_result = await self._execute_step(step, parameters or {})
-                result.results[step.name] = step_result
-                result.steps_completed += 1
+                for task in done:
+                    name = running.pop(task)
+                    step_result = task.result()
+                    result.results[name] = step_result
+                    result.steps_completed += 1
+                    
+                    if step_result.error is not None:
+                        failure = failure or f"Step '{name}' failed: {step_result.error}"
+                    else:
+                        sorter.done(name)
                 
-                # Check if step failed
-                if "error" in step_result:
-                    raise Exception(f"Step '{step.name}' failed: {step_result['error']}")
+                if failure:
+                    # Cancel sibling steps; the task group waits for them on exit
+                    for task in running:
+                        task.cancel()
+                    break
+        
+        return failure
+    
+    async def _execute_steps_serial(self, steps: List[WorkflowStep], workflow_params: Dict[str, Any],
+                                    result: WorkflowResult) -> Optional[str]:
+        """
+        Execute steps one at a time in registration order.
+        Returns the failure message, or None if every step completed.
+        """
+        completed = set()
+        for i, step in enumerate(steps):
+            logger.info("Executing step %d/%d: %s", i + 1, len(steps), step.name)
             
-            result.status = WorkflowStatus.COMPLETED
-            result.end_time = datetime.now()
-            logging.info(f"Workflow '{workflow_id}' completed successfully")
+            # Check dependencies
+            if not step.depends_on.issubset(completed):
+                return f"Dependency '{min(step.depends_on - completed)}' not completed"
             
-        except Exception as e:
-            result.status = WorkflowStatus.FAILED
-            result.end_time = datetime.now()
-            result.error = str(e)
-            logging.error(f"Workflow '{workflow_id}' failed: {e}")
-        
-        finally:
-            if workflow_id in self.running_workflows:
-                del self.running_workflows[workflow_id]
+            # Execute step with retry logic
+            step_result = await self._execute_step(step, workflow_params)
+            result.results[step.name] = step_result
+            result.steps_completed += 1
+            
+            # Check if step failed
+            if step_result.error is not None:
+                return f"Step '{step.name}' failed: {step_result.error}"
+            completed.add(step.name)
         
-        return result
+        return None
     
-    async def _execute_step(self, step: WorkflowStep, workflow_params: Dict[str, Any]) -> Dict[str, Any]:
+    async def _execute_step(self, step: WorkflowStep, workflow_params: Dict[str, Any]) -> StepOutcome:
         """Execute a single workflow step with retry logic"""
+        # Merge step parameters with workflow parameters once for all attempts
+        params = {**workflow_params, **step.parameters} if workflow_params else step.parameters
+        
+        delay = step.backoff_base
         for attempt in range(step.max_retries + 1):
+            if attempt:
+                # Decorrelated jitter keeps concurrent retries from synchronizing
+                delay = min(step.backoff_cap, random.uniform(step.backoff_base, delay * 3))
+                await asyncio.sleep(delay)
+            
             try:
-                # Merge step parameters with workflow parameters
-                params = {**workflow_params, **step.parameters}
+                # Execute step with timeout, once a concurrency slot is free
+                async with self._step_semaphore, asyncio.timeout(step.timeout):
+                    result = await step.function(**params)
                 
-                # Execute step with timeout
-                result = await asyncio.wait_for(
-                    step.function(**params),
-                    timeout=step.timeout
+                return StepOutcome(
+                    success=True,
+                    result=result,
+                    error=None,
+                    attempt=attempt + 1,
+                    timestamp_ns=time.time_ns()
                 )
                 
-                return {
-                    "success": True,
-                    "result": result,
-                    "attempt": attempt + 1,
-                    "timestamp": datetime.now().isoformat()
-                }
-                
-            except asyncio.TimeoutError:
+            except asyncio.TimeoutError as e:
                 error_msg = f"Step '{step.name}' timed out after {step.timeout} seconds"
-                logging.warning(f"{error_msg} (attempt {attempt + 1}/{step.max_retries + 1})")
+                logger.warning("%s (attempt %d/%d)", error_msg, attempt + 1, step.max_retries + 1)
                 
-                if attempt == step.max_retries:
-                    return {"error": error_msg, "attempt": attempt + 1}
+                if attempt == step.max_retries or not isinstance(e, step.retry_on):
+                    return StepOutcome(
+                        success=False,
+                        result=None,
+                        error=error_msg,
+                        attempt=attempt + 1,
+                        timestamp_ns=time.time_ns()
+                    )
                 
             except Exception as e:
                 error_msg = f"Step '{step.name}' failed: {str(e)}"
-                logging.warning(f"{error_msg} (attempt {attempt + 1}/{step.max_retries + 1})")
+                logger.warning("%s (attempt %d/%d)", error_msg, attempt + 1, step.max_retries + 1)
                 
-                if attempt == step.max_retries:
-                    return {"error": error_msg, "attempt": attempt + 1}
-            
-            # Wait before retry
-            if attempt < step.max_retries:
-                await asyncio.sleep(2 ** attempt)  # Exponential backoff
+                if attempt == step.max_retries or not isinstance(e, step.retry_on):
+                    return StepOutcome(
+                        success=False,
+                        result=None,
+                        error=error_msg,
+                        attempt=attempt + 1,
+                        timestamp_ns=time.time_ns()
+                    )
         
-        return {"error": "Max retries exceeded"}
+        return StepOutcome(
+            success=False,
+            result=None,
+            error="Max retries exceeded",
+            attempt=step.max_retries + 1,
+            timestamp_ns=time.time_ns()
+        )
 
 class CLMAutomationOrchestrator:
     """
@@ -182,14 +329,18 @@ class CLMAutomationOrchestrator:
     async def initialize(self) -> bool:
         """Initialize the automation orchestrator"""
         try:
+            # Step definitions don't depend on the server, so build them up front
+            default_workflows = self._build_default_workflows()
+            
             if await self.ai_agent.initialize():
                 self.initialized = True
-                await self._register_default_workflows()
-                logging.info("CLM Automation Orchestrator initialized successfully")
+                for workflow_id, steps in default_workflows:
+                    self.workflow_engine.register_workflow(workflow_id, steps)
+                logger.info("CLM Automation Orchestrator initialized successfully")
                 return True
             return False
         except Exception as e:
-            logging.error(f"Error initializing orchestrator: {e}")
+            logger.error("Error initializing orchestrator: %s", e)
             return False
     
     async def shutdown(self):
@@ -197,8 +348,8 @@ class CLMAutomationOrchestrator:
         await self.ai_agent.shutdown()
         self.initialized = False
     
-    async def _register_default_workflows(self):
-        """Register default workflows"""
+    def _build_default_workflows(self) -> List[Tuple[str, List[WorkflowStep]]]:
+        """Build the (workflow_id, steps) pairs for the default workflows"""
         
         # Daily Analysis Workflow
         daily_workflow = [
@@ -224,8 +375,6 @@ class CLMAutomationOrchestrator:
             )
         ]
         
-        self.workflow_engine.register_workflow("daily_analysis", daily_workflow)
-        
         # Document Processing Workflow
         processing_workflow = [
             WorkflowStep(
@@ -241,8 +390,6 @@ class CLMAutomationOrchestrator:
             )
         ]
         
-        self.workflow_engine.register_workflow("document_processing", processing_workflow)
-        
         # Contract Analysis Workflow
         analysis_workflow = [
             WorkflowStep(
@@ -263,68 +410,70 @@ class CLMAutomationOrchestrator:
             )
         ]
         
-        self.workflow_engine.register_workflow("contract_analysis", analysis_workflow)
+        return [
+            ("daily_analysis", daily_workflow),
+            ("document_processing", processing_workflow),
+            ("contract_analysis", analysis_workflow)
+        ]
     
-    async def run_daily_automation(self) -> Dict[str, Any]:
-        """Run daily automation workflow"""
+    async def _dispatch(self, func: Callable[..., Awaitable[Any]], *args) -> Any:
+        """Await func(*args), or return an error response if not initialized"""
         if not self.initialized:
-            return {"error": "Orchestrator not initialized"}
-        
-        result = await self.workflow_engine.execute_workflow("daily_analysis")
+            # A fresh dict each time, since callers may serialize, mutate or merge it
+            return {"error": _NOT_INIT_MESSAGE}
+        return await func(*args)
+    
+    async def _run_workflow(self, workflow_id: str, parameters: Dict[str, Any] = None) -> Dict[str, Any]:
+        """Execute a registered workflow and stamp its completion time"""
+        result = await self.workflow_engine.execute_workflow(workflow_id, parameters)
         return {
             "workflow_result": result,
             "timestamp": datetime.now().isoformat()
         }
     
+    async def run_daily_automation(self) -> Dict[str, Any]:
+        """Run daily automation workflow"""
+        return await self._dispatch(self._run_workflow, "daily_analysis")
+    
     async def process_new_documents(self, force_reprocess: bool = False) -> Dict[str, Any]:
         """Process new documents workflow"""
-        if not self.initialized:
-            return {"error": "Orchestrator not initialized"}
-        
-        result = await self.workflow_engine.execute_workflow(
+        return await self._dispatch(
+            self._run_workflow,
             "document_processing",
             {"force_reprocess": force_reprocess}
         )
-        return {
-            "workflow_result": result,
-            "timestamp": datetime.now().isoformat()
-        }
     
     async def analyze_contracts(self, analysis_type: str = "comprehensive") -> Dict[str, Any]:
         """Analyze contracts using AI agent"""
-        if not self.initialized:
-            return {"error": "Orchestrator not initialized"}
-        
-        return await self.ai_agent.analyze_contracts(analysis_type)
+        return await self._dispatch(self.ai_agent.analyze_contracts, analysis_type)
     
     async def answer_question(self, question: str) -> Dict[str, Any]:
         """Answer a question about contracts"""
-        if not self.initialized:
-            return {"error": "Orchestrator not initialized"}
-        
-        return await self.ai_agent.answer_contract_question(question)
+        return await self._dispatch(self.ai_agent.answer_contract_question, question)
     
     async def start_monitoring(self, check_interval: int = 3600) -> None:
         """Start continuous contract monitoring"""
         if not self.initialized:
-            logging.error("Orchestrator not initialized")
+            logger.error("Orchestrator not initialized")
             return
         
         await self.ai_agent.monitor_contracts(check_interval)
     
     async def get_workflow_status(self, workflow_id: str = None) -> Dict[str, Any]:
         """Get status of workflows"""
+        workflow_engine = self.workflow_engine
         if workflow_id:
-            if workflow_id in self.workflow_engine.running_workflows:
-                return {"status": "running", "workflow": self.workflow_engine.running_workflows[workflow_id]}
-            elif workflow_id in self.workflow_engine.workflows:
-                return {"status": "registered", "workflow": self.workflow_engine.workflows[workflow_id]}
-            else:
-                return {"error": f"Workflow '{workflow_id}' not found"}
+            running = workflow_engine.running_workflows.get(workflow_id)
+            if running is not None:
+                return {"status": "running", "workflow": running}
+            registered = workflow_engine.workflows.get(workflow_id)
+            if registered is not None:
+                return {"status": "registered", "workflow": registered}
+            return {"error": f"Workflow '{workflow_id}' not found"}
         else:
             return {
-                "registered_workflows": list(self.workflow_engine.workflows.keys()),
-                "running_workflows": list(self.workflow_engine.running_workflows.keys())
+                "registered_workflows": workflow_engine.registered_workflow_ids,
+                "running_workflows": tuple(workflow_engine.running_workflows)
             }
 
 # Example usage and testing
@@ -3,12 +3,38 @@ MCP Server for CLM Automation System.
 Provides standardized interface for AI agents to interact with contract management tools.
 """
 import asyncio
+import hashlib
+import inspect
 import json
 import logging
-from typing import Any, Dict, List, Optional
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from dataclasses import dataclass, fields
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple, Union, get_args, get_origin
 from datetime import datetime
 import sys
 import os
+import signal
+import struct
+import time
+
+import numpy as np
+
+# orjson is optional; it parses and emits bytes several times faster than json
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+# msgspec is optional; when present it type-checks tool arguments in C
+try:
+    import msgspec
+    MSGSPEC_AVAILABLE = True
+except ImportError:
+    MSGSPEC_AVAILABLE = False
 
 # Add the current directory to Python path
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
@@ -20,6 +46,388 @@ from daily_agent import DailyContractAgent
 from similarity_detector import DocumentSimilarityDetector
 from main import CLMAutomationSystem
 
+def _json_default(obj: Any) -> Any:
+    """Encode values the JSON encoders don't handle natively, such as NumPy scalars and arrays"""
+    if isinstance(obj, np.generic):
+        return obj.item()
+    if isinstance(obj, np.ndarray):
+        return obj.tolist()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+if ORJSON_AVAILABLE:
+    _loads = orjson.loads
+    _DUMPS_OPTIONS = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+    
+    def _dumps(obj: Any) -> bytes:
+        """Compact JSON encoding as bytes"""
+        return orjson.dumps(obj, default=_json_default, option=_DUMPS_OPTIONS)
+else:
+    _loads = json.loads
+    
+    def _dumps(obj: Any) -> bytes:
+        """Compact JSON encoding as bytes"""
+        return json.dumps(obj, separators=(",", ":"), default=_json_default).encode()
+
+# Longest request line accepted from stdin
+_MAX_LINE_BYTES = 16 * 1024 * 1024
+
+# MCP_FRAMING=length switches stdio from newline-delimited JSON to 4-byte
+# little-endian length-prefixed frames, so large bodies need no line scanning
+_LENGTH_PREFIXED = os.getenv("MCP_FRAMING", "newline").lower() == "length"
+_FRAME_HEADER = struct.Struct("<I")
+
+# Seconds a memoized conflict/expiration scan stays valid for an unchanged corpus
+_ANALYSIS_CACHE_TTL = 60.0
+# Most memoized scans kept at once; clients choose arguments such as days freely
+_ANALYSIS_CACHE_SIZE = 256
+
+# Below this many documents an exact similarity scan is already cheap
+_LSH_MIN_DOCUMENTS = 1000
+
+# Response timestamps are reused for this many seconds
+_TIMESTAMP_RESOLUTION = 0.5
+
+# Pre-encoded JSON-RPC error bodies; only the id and message are encoded per error
+_RESPONSE_HEAD = b'{"jsonrpc":"2.0","id":'
+_ERROR_HEADS = {
+    code: f',"error":{{"code":{code},"message":'.encode()
+    for code in (-32700, -32601, -32603)
+}
+
+# Tool argument types; defaults mirror the schemas in CLMMCPServer._initialize_tools
+@dataclass(slots=True, frozen=True)
+class ProcessDocumentsArgs:
+    force_reprocess: bool = False
+    batch_size: int = 64
+    num_workers: Optional[int] = None
+
+@dataclass(slots=True, frozen=True)
+class AskQuestionArgs:
+    question: str
+    max_results: int = 5
+
+@dataclass(slots=True, frozen=True)
+class FindSimilarDocumentsArgs:
+    doc_id: str
+    n_results: int = 5
+
+@dataclass(slots=True, frozen=True)
+class SearchDocumentsArgs:
+    query: str
+    n_results: int = 5
+    stream: bool = False
+
+@dataclass(slots=True, frozen=True)
+class RunDailyAnalysisArgs:
+    send_email: bool = True
+
+@dataclass(slots=True, frozen=True)
+class GetSystemStatusArgs:
+    pass
+
+@dataclass(slots=True, frozen=True)
+class GenerateReportArgs:
+    report_type: str = "comprehensive"
+    stream: bool = False
+
+@dataclass(slots=True, frozen=True)
+class DetectConflictsArgs:
+    conflict_type: str = "all"
+
+@dataclass(slots=True, frozen=True)
+class FindExpiringContractsArgs:
+    days: int = 30
+
+@dataclass(slots=True, frozen=True)
+class BatchExecuteArgs:
+    # Field names follow the camelCase wire schema
+    operations: List[Dict[str, Any]]
+    maxConcurrent: int = 4
+    stopOnError: bool = False
+    timeoutMs: int = 30000
+
+_TOOL_ARGS: Dict[str, type] = {
+    "process_documents": ProcessDocumentsArgs,
+    "ask_question": AskQuestionArgs,
+    "find_similar_documents": FindSimilarDocumentsArgs,
+    "search_documents": SearchDocumentsArgs,
+    "run_daily_analysis": RunDailyAnalysisArgs,
+    "get_system_status": GetSystemStatusArgs,
+    "generate_report": GenerateReportArgs,
+    "detect_conflicts": DetectConflictsArgs,
+    "find_expiring_contracts": FindExpiringContractsArgs,
+    "batch_execute": BatchExecuteArgs
+}
+
+_ARG_FIELDS = {arg_type: {f.name: f.type for f in fields(arg_type)} for arg_type in _TOOL_ARGS.values()}
+
+def _matches(value: Any, annotation: Any) -> bool:
+    """Whether a decoded JSON value fits a tool argument annotation"""
+    if annotation is Any:
+        return True
+    origin = get_origin(annotation)
+    if origin is Union:
+        return any(_matches(value, arg) for arg in get_args(annotation))
+    if origin is list:
+        item, = get_args(annotation)
+        return isinstance(value, list) and all(_matches(v, item) for v in value)
+    if origin is dict:
+        key_type, value_type = get_args(annotation)
+        return isinstance(value, dict) and all(
+            _matches(k, key_type) and _matches(v, value_type) for k, v in value.items()
+        )
+    if annotation is type(None):
+        return value is None
+    if annotation is int:
+        # bool subclasses int, but true/false is never a valid count
+        return isinstance(value, int) and not isinstance(value, bool)
+    return isinstance(value, annotation)
+
+def _convert_args_plain(arguments: Dict[str, Any], arg_type: type) -> Any:
+    """Type-check tool arguments against their dataclass, ignoring unknown keys"""
+    annotations = _ARG_FIELDS[arg_type]
+    values = {}
+    for key, value in arguments.items():
+        if key not in annotations:
+            continue
+        annotation = annotations[key]
+        if not _matches(value, annotation):
+            expected = annotation.__name__ if isinstance(annotation, type) else annotation
+            raise TypeError(f"'{key}' expected {expected}, got {type(value).__name__}")
+        values[key] = value
+    return arg_type(**values)
+
+if MSGSPEC_AVAILABLE:
+    _ARG_ERRORS: Tuple[type, ...] = (TypeError, msgspec.ValidationError)
+    
+    def _convert_args(arguments: Dict[str, Any], arg_type: type) -> Any:
+        """Validate tool arguments against their dataclass, ignoring unknown keys"""
+        return msgspec.convert(arguments, arg_type)
+else:
+    _ARG_ERRORS = (TypeError,)
+    _convert_args = _convert_args_plain
+
+class SemanticCache:
+    """
+    Approximate key-value cache matched by cosine similarity.
+    A lookup hits when the query embedding is within `tau` of a cached key.
+    Keys are stored as int8 with a per-row scale, a quarter of the float32 footprint.
+    """
+    
+    def __init__(self, dim: int, capacity: int = 256, tau: float = 0.95):
+        self.tau = tau
+        self.capacity = capacity
+        self.keys = np.zeros((capacity, dim), dtype=np.int8)  # Quantized L2-normalized rows
+        self.scales = np.zeros(capacity, dtype=np.float32)  # Row i ~= keys[i] * scales[i]
+        self.values: "OrderedDict[int, Any]" = OrderedDict()  # Row -> value, least recently used first
+    
+    @staticmethod
+    def _quantize(vector: np.ndarray) -> Optional[Tuple[np.ndarray, float]]:
+        """Normalize a vector and map it to int8 plus a scale, or None if it is all zeros"""
+        norm = np.linalg.norm(vector)
+        if not norm:
+            return None
+        unit = vector / norm
+        scale = float(np.abs(unit).max()) / 127
+        return np.round(unit / scale).astype(np.int8), scale
+    
+    def get(self, vector: np.ndarray) -> Optional[Any]:
+        """Return the value cached under the closest key, if it is close enough"""
+        if not self.values:
+            return None
+        quantized = self._quantize(vector)
+        if quantized is None:
+            return None
+        query, query_scale = quantized
+        
+        # Rows fill from the top, so only the occupied prefix is scanned.
+        # Accumulate in int32: int8 products summed over the dimension overflow int16.
+        used = len(self.values)
+        dots = self.keys[:used].astype(np.int32) @ query.astype(np.int32)
+        sims = dots * (self.scales[:used] * query_scale)
+        row = int(sims.argmax())
+        if sims[row] < self.tau:
+            return None
+        self.values.move_to_end(row)
+        return self.values[row]
+    
+    def put(self, vector: np.ndarray, value: Any):
+        """Cache a value, evicting the least recently used entry when full"""
+        quantized = self._quantize(vector)
+        if quantized is None:
+            return
+        if len(self.values) < self.capacity:
+            row = len(self.values)
+        else:
+            row, _ = self.values.popitem(last=False)
+        self.keys[row], self.scales[row] = quantized
+        self.values[row] = value
+    
+    def clear(self):
+        """Drop every cached entry"""
+        self.values.clear()
+    
+    def export(self) -> Tuple[np.ndarray, np.ndarray, List[Any]]:
+        """Keys, scales and values, least recently used first"""
+        rows = list(self.values)
+        return self.keys[rows], self.scales[rows], list(self.values.values())
+    
+    def restore(self, keys: np.ndarray, scales: np.ndarray, values: List[Any]):
+        """Load entries produced by export(), keeping the most recent ones that fit"""
+        skip = max(0, len(values) - self.capacity)
+        count = len(values) - skip
+        self.keys[:count] = keys[skip:]
+        self.scales[:count] = scales[skip:]
+        self.values = OrderedDict(enumerate(values[skip:]))
+
+class LSHIndex:
+    """
+    Random-projection LSH over document vectors.
+    Documents sharing a signature with the query in any table become re-rank candidates.
+    """
+    
+    def __init__(self, dim: int, n_tables: int = 8, n_bits: int = 16, seed: int = 0):
+        rng = np.random.default_rng(seed)
+        self.projections = rng.standard_normal((n_tables, n_bits, dim)).astype(np.float32)
+        self._bit_weights = np.left_shift(np.uint64(1), np.arange(n_bits, dtype=np.uint64))
+        self.buckets: List[Dict[int, List[int]]] = []  # Per table: signature -> row indices
+    
+    def _signatures(self, vectors) -> np.ndarray:
+        """Hash each row of a dense or sparse matrix to one integer per table"""
+        bits = np.stack([np.asarray(vectors @ projection.T) > 0 for projection in self.projections])
+        return bits.astype(np.uint64) @ self._bit_weights  # (n_tables, n_rows)
+    
+    def build(self, vectors):
+        """Index every row of the document matrix"""
+        self.buckets = []
+        for signatures in self._signatures(vectors).tolist():
+            buckets: Dict[int, List[int]] = {}
+            for row, signature in enumerate(signatures):
+                buckets.setdefault(signature, []).append(row)
+            self.buckets.append(buckets)
+    
+    def candidates(self, vector) -> np.ndarray:
+        """Rows that collide with a single query vector in at least one table"""
+        rows = set()
+        for buckets, signature in zip(self.buckets, self._signatures(vector)[:, 0].tolist()):
+            rows.update(buckets.get(signature, ()))
+        return np.fromiter(rows, dtype=np.intp, count=len(rows))
+
+class BatchedEmbedder:
+    """
+    Coalesces concurrent single-query embedding requests.
+    Queries arriving within `max_wait` seconds share one batched encode call.
+    """
+    
+    def __init__(self, encode: Callable[[List[str]], Optional[np.ndarray]],
+                 max_batch: int = 32, max_wait: float = 0.005):
+        self.encode = encode
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+    
+    async def encode_one(self, text: str) -> Optional[np.ndarray]:
+        """Embed a single text as part of the next batch"""
+        loop = asyncio.get_running_loop()
+        if self._worker is None or self._worker.done() or self._worker.get_loop() is not loop:
+            self._queue = asyncio.Queue()
+            self._worker = loop.create_task(self._run())
+        
+        future = loop.create_future()
+        self._queue.put_nowait((text, future))
+        return await future
+    
+    async def aclose(self):
+        """Stop the batching task and fail any queries still waiting on it"""
+        worker, self._worker = self._worker, None
+        if worker is None or worker.done():
+            return
+        
+        worker.cancel()
+        try:
+            await worker
+        except asyncio.CancelledError:
+            pass
+        
+        while not self._queue.empty():
+            _, future = self._queue.get_nowait()
+            future.cancel()
+    
+    async def _run(self):
+        """Drain the queue in batches for as long as the loop runs"""
+        loop = asyncio.get_running_loop()
+        queue = self._queue
+        while True:
+            batch = [await queue.get()]
+            deadline = loop.time() + self.max_wait
+            while len(batch) < self.max_batch:
+                if not queue.empty():
+                    batch.append(queue.get_nowait())
+                    continue
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(queue.get(), remaining))
+                except asyncio.TimeoutError:
+                    break
+            
+            try:
+                vectors = await loop.run_in_executor(None, self.encode, [text for text, _ in batch])
+            except Exception as e:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+            
+            for i, (_, future) in enumerate(batch):
+                if not future.done():
+                    future.set_result(None if vectors is None else vectors[i])
+
+class ReadWriteLock:
+    """
+    Lets any number of readers in at once, or a single writer on its own.
+    A waiting writer holds back new readers so reprocessing is not starved.
+    """
+    
+    def __init__(self):
+        self._condition = threading.Condition()
+        self._readers = 0
+        self._writing = False
+        self._writers_waiting = 0
+    
+    @contextmanager
+    def shared(self):
+        """Hold the lock alongside other readers"""
+        with self._condition:
+            while self._writing or self._writers_waiting:
+                self._condition.wait()
+            self._readers += 1
+        try:
+            yield
+        finally:
+            with self._condition:
+                self._readers -= 1
+                if not self._readers:
+                    self._condition.notify_all()
+    
+    @contextmanager
+    def exclusive(self):
+        """Hold the lock alone"""
+        with self._condition:
+            self._writers_waiting += 1
+            while self._writing or self._readers:
+                self._condition.wait()
+            self._writers_waiting -= 1
+            self._writing = True
+        try:
+            yield
+        finally:
+            with self._condition:
+                self._writing = False
+                self._condition.notify_all()
+
 # MCP Server Implementation
 class CLMMCPServer:
     """
@@ -31,6 +439,39 @@ class CLMMCPServer:
         self.config = Config()
         self.clm_system = None
         self.tools = {}
+        self._semantic_caches: Dict[Tuple[str, int], SemanticCache] = {}
+        # (tool, variant, normalized text) -> value, least recently used first
+        self._exact_answers: "OrderedDict[Tuple[str, int, str], Any]" = OrderedDict()
+        # Key -> (stored at, result), oldest first
+        self._analysis_cache: "OrderedDict[Tuple[Any, ...], Tuple[float, Any]]" = OrderedDict()
+        self._corpus_version = 0  # Bumped whenever documents are reprocessed
+        self._lsh_index: Optional[LSHIndex] = None
+        self._lsh_source = None  # Document matrix the LSH index was built from
+        self._ts_cache: Tuple[float, str] = (float("-inf"), "")  # (monotonic time, ISO timestamp)
+        self._inflight: Dict[Tuple[Any, ...], asyncio.Future] = {}  # Call key -> shared pending result
+        # Tool handlers share the CLM system's in-memory state, so they run on threads, not processes
+        self._executor = ThreadPoolExecutor(
+            max_workers=min(32, (os.cpu_count() or 1) + 4),
+            thread_name_prefix="clm-tool"
+        )
+        self._agent_lock = threading.Lock()  # Serializes runs that read the agent's alert window
+        self._state_lock = ReadWriteLock()  # Tools read CLM state together; (re)indexing runs alone
+        self._init_lock = asyncio.Lock()  # Held while the CLM system is being created
+        
+        # Tool name -> handler, resolved once instead of walking an if/elif chain per call
+        self._tool_handlers: Dict[str, Callable[[Any], Any]] = {
+            "process_documents": self._process_documents,
+            "ask_question": self._ask_question,
+            "find_similar_documents": self._find_similar_documents,
+            "search_documents": self._search_documents,
+            "run_daily_analysis": self._run_daily_analysis,
+            "get_system_status": self._get_system_status,
+            "generate_report": self._generate_report,
+            "detect_conflicts": self._detect_conflicts,
+            "find_expiring_contracts": self._find_expiring_contracts,
+            "batch_execute": self._batch_execute
+        }
+        self._embedder = BatchedEmbedder(self._embed_queries)
         self._initialize_tools()
         
     def _initialize_tools(self):
@@ -46,6 +487,15 @@ class CLMMCPServer:
                             "type": "boolean",
                             "description": "Force reprocessing of all documents",
                             "default": False
+                        },
+                        "batch_size": {
+                            "type": "integer",
+                            "description": "Chunks sent to the vector database per embedding call",
+                            "default": 64
+                        },
+                        "num_workers": {
+                            "type": "integer",
+                            "description": "Threads used to read and parse document files (defaults to the CPU count)"
                         }
                     }
                 }
@@ -102,6 +552,11 @@ class CLMMCPServer:
                             "type": "integer",
                             "description": "Number of results to return",
                             "default": 5
+                        },
+                        "stream": {
+                            "type": "boolean",
+                            "description": "Send each result as a tools/progress notification",
+                            "default": False
                         }
                     },
                     "required": ["query"]
@@ -140,6 +595,11 @@ class CLMMCPServer:
                             "description": "Type of report to generate",
                             "enum": ["daily", "comprehensive", "similarity", "conflicts"],
                             "default": "comprehensive"
+                        },
+                        "stream": {
+                            "type": "boolean",
+                            "description": "Send each report section as a tools/progress notification",
+                            "default": False
                         }
                     }
                 }
@@ -172,161 +632,525 @@ class CLMMCPServer:
                         }
                     }
                 }
+            },
+            "batch_execute": {
+                "name": "batch_execute",
+                "description": "Run several tool calls concurrently and return all results together",
+                "parameters": {
+                    "type": "object",
+                    "properties": {
+                        "operations": {
+                            "type": "array",
+                            "description": "Tool calls to run",
+                            "items": {
+                                "type": "object",
+                                "properties": {
+                                    "tool": {"type": "string"},
+                                    "arguments": {"type": "object"}
+                                },
+                                "required": ["tool"]
+                            }
+                        },
+                        "maxConcurrent": {
+                            "type": "integer",
+                            "description": "Maximum number of operations running at once",
+                            "default": 4
+                        },
+                        "stopOnError": {
+                            "type": "boolean",
+                            "description": "Cancel remaining operations after the first failure",
+                            "default": False
+                        },
+                        "timeoutMs": {
+                            "type": "integer",
+                            "description": "Per-operation timeout in milliseconds",
+                            "default": 30000
+                        }
+                    },
+                    "required": ["operations"]
+                }
             }
         }
+        
+        # The catalog is static, so build the tools/list payload once
+        self._tools_list = list(self.tools.values())
+        self._tools_list_json = _dumps({"tools": self._tools_list})
     
     async def initialize_system(self) -> bool:
         """Initialize the CLM system"""
+        if self.clm_system:
+            return True
+        
+        # Concurrent first calls wait for one initialization instead of starting their own
+        async with self._init_lock:
+            if self.clm_system:
+                return True
+            try:
+                system = CLMAutomationSystem(self.config)
+                if not await self._run_exclusive(system.initialize):
+                    return False
+            except Exception as e:
+                logging.error(f"Error initializing CLM system: {e}")
+                return False
+            # Publish only a fully initialized system; a failed attempt is retried on the next call
+            self.clm_system = system
+            return True
+    
+    def _semantic_cache_path(self) -> str:
+        """File the semantic caches are persisted to"""
+        return os.path.join(self.config.SEMANTIC_CACHE_DIRECTORY, "semantic_cache.npz")
+    
+    def _corpus_fingerprint(self) -> Optional[str]:
+        """Identify the indexed corpus; cached embeddings are only valid for the same one"""
+        detector = self.clm_system.similarity_detector if self.clm_system else None
+        if detector is None or detector.document_vectors is None:
+            return None
+        
+        # Document ids already encode each file's path, size and mtime
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(str(detector.document_vectors.shape).encode())
+        for metadata in detector.document_metadata:
+            digest.update(str(metadata.get("doc_id", "")).encode())
+            digest.update(b"\0")
+        return digest.hexdigest()
+    
+    def save_semantic_cache(self):
+        """Persist the semantic caches so a restart starts warm"""
+        fingerprint = self._corpus_fingerprint()
+        if fingerprint is None or not any(cache.values for cache in self._semantic_caches.values()):
+            return
+        
+        try:
+            arrays = {}
+            caches = []
+            for i, ((tool_name, variant), cache) in enumerate(self._semantic_caches.items()):
+                arrays[f"keys_{i}"], arrays[f"scales_{i}"], values = cache.export()
+                caches.append({"tool": tool_name, "variant": variant, "values": values})
+            meta = _dumps({"fingerprint": fingerprint, "caches": caches})
+            arrays["meta"] = np.frombuffer(meta, dtype=np.uint8)
+            
+            # Write beside the target and swap it in, so a crash never leaves a torn file
+            path = self._semantic_cache_path()
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            temp_path = path + ".tmp"
+            with open(temp_path, "wb") as f:
+                np.savez(f, **arrays)
+            os.replace(temp_path, path)
+        except Exception as e:
+            logging.warning(f"Could not save semantic cache: {e}")
+    
+    def load_semantic_cache(self):
+        """Restore semantic caches saved for the same corpus"""
+        path = self._semantic_cache_path()
+        fingerprint = self._corpus_fingerprint()
+        if fingerprint is None or not os.path.exists(path):
+            return
+        
+        try:
+            with np.load(path) as data:
+                meta = _loads(data["meta"].tobytes())
+                if meta["fingerprint"] != fingerprint:
+                    return
+                for i, entry in enumerate(meta["caches"]):
+                    keys = data[f"keys_{i}"]
+                    cache = SemanticCache(
+                        keys.shape[1],
+                        capacity=self.config.SEMANTIC_CACHE_SIZE,
+                        tau=self.config.SEMANTIC_CACHE_THRESHOLD
+                    )
+                    cache.restore(keys, data[f"scales_{i}"], entry["values"])
+                    self._semantic_caches[(entry["tool"], entry["variant"])] = cache
+        except Exception as e:
+            logging.warning(f"Could not load semantic cache: {e}")
+    
+    async def warmup(self):
+        """Exercise the status and embedding paths so the first real request doesn't pay their setup cost"""
         try:
-            if not self.clm_system:
-                self.clm_system = CLMAutomationSystem(self.config)
-                return await asyncio.get_event_loop().run_in_executor(
-                    None, self.clm_system.initialize
+            await self.call_tool("get_system_status", {})
+            await self._embedder.encode_one("warmup")
+        except Exception as e:
+            logging.warning(f"Warm-up failed: {e}")
+    
+    def _now_iso(self) -> str:
+        """Current time in ISO format, refreshed at most every _TIMESTAMP_RESOLUTION seconds"""
+        now = time.monotonic()
+        if now - self._ts_cache[0] > _TIMESTAMP_RESOLUTION:
+            self._ts_cache = (now, datetime.now().isoformat())
+        return self._ts_cache[1]
+    
+    async def _run_blocking(self, func: Callable[..., Any], *args) -> Any:
+        """Run a blocking CLM call on the tool thread pool, alongside other readers of CLM state"""
+        return await asyncio.get_running_loop().run_in_executor(self._executor, self._with_shared, func, *args)
+    
+    async def _run_exclusive(self, func: Callable[..., Any], *args) -> Any:
+        """Run a blocking CLM call that rebuilds CLM state, with no other tool call in progress"""
+        return await asyncio.get_running_loop().run_in_executor(self._executor, self._with_exclusive, func, *args)
+    
+    def _with_shared(self, func: Callable[..., Any], *args) -> Any:
+        """Call func under the shared state lock"""
+        with self._state_lock.shared():
+            return func(*args)
+    
+    def _with_exclusive(self, func: Callable[..., Any], *args) -> Any:
+        """Call func under the exclusive state lock"""
+        with self._state_lock.exclusive():
+            return func(*args)
+    
+    def _run_agent(self, func: Callable[..., Any], *args) -> Any:
+        """Call a daily agent method while no expiration scan has its window swapped"""
+        with self._agent_lock:
+            return func(*args)
+    
+    def _embed_queries(self, texts: List[str]) -> Optional[np.ndarray]:
+        """
+        Embed queries with the RAG pipeline's sentence embeddings.
+        Returns None when no embedding model is configured; keyword vectors are not used
+        because they drop words like "not" or "before" that change what is asked.
+        """
+        rag_pipeline = self.clm_system.rag_pipeline
+        if rag_pipeline is None or rag_pipeline.embeddings is None:
+            return None
+        return rag_pipeline.embed_batch(texts)
+    
+    async def _semantic_lookup(self, tool_name: str, text: str, variant: int, compute: Callable[[], Any]) -> Any:
+        """
+        Serve compute() from cache when the same query, or with sentence embeddings a
+        near-identical one, was already answered.
+        """
+        exact_key = (tool_name, variant, " ".join(text.lower().split()))
+        value = self._exact_answers.get(exact_key)
+        if value is not None:
+            self._exact_answers.move_to_end(exact_key)
+            return value
+        
+        cache = None
+        vector = await self._embedder.encode_one(text)
+        if vector is not None and vector.any():
+            key = (tool_name, variant)
+            cache = self._semantic_caches.get(key)
+            if cache is None or cache.keys.shape[1] != vector.shape[0]:
+                cache = self._semantic_caches[key] = SemanticCache(
+                    vector.shape[0],
+                    capacity=self.config.SEMANTIC_CACHE_SIZE,
+                    tau=self.config.SEMANTIC_CACHE_THRESHOLD
                 )
-            return True
+            value = cache.get(vector)
+            if value is not None:
+                return value
+        
+        corpus_version = self._corpus_version
+        value = await self._run_blocking(compute)
+        # Empty and failed lookups are not worth remembering, nor are ones that raced a reprocess
+        if value and not (isinstance(value, dict) and "error" in value) \
+                and corpus_version == self._corpus_version:
+            self._exact_answers[exact_key] = value
+            if len(self._exact_answers) > self.config.SEMANTIC_CACHE_SIZE:
+                self._exact_answers.popitem(last=False)
+            if cache is not None:
+                cache.put(vector, value)
+        return value
+    
+    async def _singleflight(self, key: Tuple[Any, ...], compute: Callable[[], Awaitable[Any]]) -> Any:
+        """Let concurrent identical calls share one in-flight computation"""
+        future = self._inflight.get(key)
+        if future is not None:
+            # Shield so a cancelled follower doesn't cancel the shared call
+            return await asyncio.shield(future)
+        
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            result = await compute()
+        except asyncio.CancelledError:
+            future.set_exception(RuntimeError("Shared request was cancelled"))
+            future.exception()  # Mark retrieved in case nobody else was waiting
+            raise
         except Exception as e:
-            logging.error(f"Error initializing CLM system: {e}")
-            return False
+            future.set_exception(e)
+            future.exception()
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            del self._inflight[key]
+    
+    async def _memoize(self, key: Tuple[Any, ...], compute: Callable[[], Any]) -> Any:
+        """Reuse compute()'s result for the same key and corpus version within the TTL"""
+        key = (*key, self._corpus_version)
+        now = time.monotonic()
+        cached = self._analysis_cache.get(key)
+        if cached is not None and now - cached[0] < _ANALYSIS_CACHE_TTL:
+            return cached[1]
+        
+        value = await self._run_blocking(compute)
+        self._store_analysis(key, value)
+        return value
+    
+    def _store_analysis(self, key: Tuple[Any, ...], value: Any):
+        """Cache an analysis result, dropping expired entries and then the oldest beyond the size limit"""
+        cache = self._analysis_cache
+        now = time.monotonic()
+        cache.pop(key, None)
+        cache[key] = (now, value)
+        # Entries are kept in insertion order, so the expired ones are all at the front
+        while cache:
+            oldest_key, (stored_at, _) = next(iter(cache.items()))
+            if now - stored_at < _ANALYSIS_CACHE_TTL and len(cache) <= _ANALYSIS_CACHE_SIZE:
+                break
+            del cache[oldest_key]
     
     async def list_tools(self) -> List[Dict[str, Any]]:
         """List available tools"""
-        return list(self.tools.values())
+        return self._tools_list
     
-    async def call_tool(self, tool_name: str, arguments: Dict[str, Any]) -> Dict[str, Any]:
-        """Call a specific tool with arguments"""
+    async def call_tool(self, tool_name: str, arguments: Dict[str, Any],
+                        emit: Optional[Callable[[Dict[str, Any]], None]] = None) -> Dict[str, Any]:
+        """
+        Call a specific tool with arguments.
+        Streamed chunks go to emit, or are collected under "chunks" when no emit is given.
+        """
         if not await self.initialize_system():
             return {"error": "Failed to initialize CLM system"}
         
-        if tool_name not in self.tools:
+        handler = self._tool_handlers.get(tool_name)
+        if handler is None:
             return {"error": f"Tool '{tool_name}' not found"}
         
         try:
-            if tool_name == "process_documents":
-                return await self._process_documents(arguments)
-            elif tool_name == "ask_question":
-                return await self._ask_question(arguments)
-            elif tool_name == "find_similar_documents":
-                return await self._find_similar_documents(arguments)
-            elif tool_name == "search_documents":
-                return await self._search_documents(arguments)
-            elif tool_name == "run_daily_analysis":
-                return await self._run_daily_analysis(arguments)
-            elif tool_name == "get_system_status":
-                return await self._get_system_status(arguments)
-            elif tool_name == "generate_report":
-                return await self._generate_report(arguments)
-            elif tool_name == "detect_conflicts":
-                return await self._detect_conflicts(arguments)
-            elif tool_name == "find_expiring_contracts":
-                return await self._find_expiring_contracts(arguments)
-            else:
-                return {"error": f"Tool '{tool_name}' not implemented"}
-                
+            args = _convert_args(arguments or {}, _TOOL_ARGS[tool_name])
+        except _ARG_ERRORS as e:
+            return {"error": f"Invalid arguments for {tool_name}: {e}"}
+        
+        try:
+            result = await handler(args)
+            if inspect.isasyncgen(result):
+                result = await self._drain_stream(result, emit)
+            return result
         except Exception as e:
             logging.error(f"Error calling tool {tool_name}: {e}")
             return {"error": f"Error executing {tool_name}: {str(e)}"}
     
-    async def _process_documents(self, args: Dict[str, Any]) -> Dict[str, Any]:
+    @staticmethod
+    async def _drain_stream(stream: AsyncIterator[Dict[str, Any]],
+                            emit: Optional[Callable[[Dict[str, Any]], None]]) -> Dict[str, Any]:
+        """Forward every streamed item but the last, which is the tool's result"""
+        chunks = []
+        result = None
+        async for item in stream:
+            if result is not None:
+                if emit is None:
+                    chunks.append(result)
+                else:
+                    emit(result)
+            result = item
+        
+        if emit is None:
+            result = {**result, "chunks": chunks}
+        return result
+    
+    async def _process_documents(self, args: ProcessDocumentsArgs) -> Dict[str, Any]:
         """Process documents tool"""
-        force_reprocess = args.get("force_reprocess", False)
+        force_reprocess = args.force_reprocess
         
         if force_reprocess:
             # Clear existing database and reprocess
-            result = self.clm_system.document_processor.process_all_documents()
+            result = await self._run_exclusive(self._reindex, args.batch_size, args.num_workers)
         else:
-            result = self.clm_system.document_processor.process_all_documents()
+            result = await self._run_exclusive(self._reindex, args.batch_size, args.num_workers)
+        
+        # Cached answers may no longer reflect the document set
+        self._corpus_version += 1
+        self._analysis_cache.clear()
+        self._lsh_index = None
+        self._exact_answers.clear()
+        for cache in self._semantic_caches.values():
+            cache.clear()
         
         return {
             "success": result,
             "message": "Documents processed successfully" if result else "Failed to process documents",
-            "timestamp": datetime.now().isoformat()
+            "timestamp": self._now_iso()
         }
     
-    async def _ask_question(self, args: Dict[str, Any]) -> Dict[str, Any]:
+    def _reindex(self, batch_size: int, num_workers: Optional[int]) -> bool:
+        """Reprocess the documents and rebuild the similarity index over them"""
+        if not self.clm_system.document_processor.process_all_documents(batch_size, num_workers):
+            return False
+        detector = self.clm_system.similarity_detector
+        if detector is not None:
+            detector.build_similarity_index(num_workers)
+        return True
+    
+    async def _ask_question(self, args: AskQuestionArgs) -> Dict[str, Any]:
         """Ask question tool"""
-        question = args["question"]
-        max_results = args.get("max_results", 5)
+        question = args.question
+        max_results = args.max_results
         
-        result = self.clm_system.ask_question(question)
+        result = await self._singleflight(("ask_question", question), lambda: self._semantic_lookup(
+            "ask_question", question, 0,
+            lambda: self.clm_system.ask_question(question)
+        ))
         
         return {
             "question": question,
             "answer": result.get("answer", ""),
             "sources": result.get("sources", []),
             "model": result.get("model", "unknown"),
-            "timestamp": result.get("timestamp", datetime.now().isoformat())
+            "timestamp": result["timestamp"] if "timestamp" in result else self._now_iso()
         }
     
-    async def _find_similar_documents(self, args: Dict[str, Any]) -> Dict[str, Any]:
+    async def _find_similar_documents(self, args: FindSimilarDocumentsArgs) -> Dict[str, Any]:
         """Find similar documents tool"""
-        doc_id = args["doc_id"]
-        n_results = args.get("n_results", 5)
+        doc_id = args.doc_id
+        n_results = args.n_results
         
-        results = self.clm_system.find_similar_documents(doc_id, n_results)
+        results = await self._singleflight(
+            ("find_similar_documents", doc_id, n_results),
+            lambda: self._run_blocking(self._find_similar_indexed, doc_id, n_results)
+        )
         
         return {
             "doc_id": doc_id,
             "similar_documents": results,
             "count": len(results),
-            "timestamp": datetime.now().isoformat()
+            "timestamp": self._now_iso()
         }
     
-    async def _search_documents(self, args: Dict[str, Any]) -> Dict[str, Any]:
+    def _find_similar_indexed(self, doc_id: str, n_results: int) -> List[Dict[str, Any]]:
+        """Find similar documents by re-ranking LSH candidates instead of scanning the corpus"""
+        detector = self.clm_system.similarity_detector
+        vectors = detector.document_vectors if detector is not None else None
+        if vectors is None or vectors.shape[0] < _LSH_MIN_DOCUMENTS:
+            return self.clm_system.find_similar_documents(doc_id, n_results)
+        
+        doc_index = detector._find_document_index(doc_id)
+        if doc_index is None:
+            return self.clm_system.find_similar_documents(doc_id, n_results)
+        
+        index = self._lsh_index
+        if index is None or self._lsh_source is not vectors:
+            index = LSHIndex(vectors.shape[1])
+            index.build(vectors)
+            self._lsh_index, self._lsh_source = index, vectors
+        
+        results = detector.rank_candidates(doc_index, index.candidates(vectors[doc_index]), n_results)
+        if len(results) < n_results:
+            # Too few bucket collisions to fill the request; fall back to the exact scan
+            return self.clm_system.find_similar_documents(doc_id, n_results)
+        return results
+    
+    async def _search_documents(self, args: SearchDocumentsArgs) -> Dict[str, Any]:
         """Search documents tool"""
-        query = args["query"]
-        n_results = args.get("n_results", 5)
+        query = args.query
+        n_results = args.n_results
+        
+        results = await self._singleflight(("search_documents", query, n_results), lambda: self._semantic_lookup(
+            "search_documents", query, n_results,
+            lambda: self.clm_system.search_documents(query, n_results)
+        ))
         
-        results = self.clm_system.search_documents(query, n_results)
+        if args.stream:
+            return self._stream_search(query, results)
         
         return {
             "query": query,
             "results": results,
             "count": len(results),
-            "timestamp": datetime.now().isoformat()
+            "timestamp": self._now_iso()
+        }
+    
+    async def _stream_search(self, query: str, results: List[Dict[str, Any]]):
+        """Yield search results one at a time, then a summary"""
+        for result in results:
+            yield {"result": result}
+        yield {
+            "query": query,
+            "count": len(results),
+            "timestamp": self._now_iso()
         }
     
-    async def _run_daily_analysis(self, args: Dict[str, Any]) -> Dict[str, Any]:
+    async def _run_daily_analysis(self, args: RunDailyAnalysisArgs) -> Dict[str, Any]:
         """Run daily analysis tool"""
-        send_email = args.get("send_email", True)
+        send_email = args.send_email
         
         if send_email:
-            result = self.clm_system.run_daily_report()
+            result = await self._run_blocking(self._run_agent, self.clm_system.run_daily_report)
         else:
-            result = self.clm_system.daily_agent.run_daily_analysis()
+            result = await self._run_blocking(self._run_agent, self.clm_system.daily_agent.run_daily_analysis)
         
         return {
             "success": result,
             "message": "Daily analysis completed successfully" if result else "Failed to complete daily analysis",
-            "timestamp": datetime.now().isoformat()
+            "timestamp": self._now_iso()
         }
     
-    async def _get_system_status(self, args: Dict[str, Any]) -> Dict[str, Any]:
+    async def _get_system_status(self, args: GetSystemStatusArgs) -> Dict[str, Any]:
         """Get system status tool"""
-        status = self.clm_system.get_system_status()
+        status = await self._run_blocking(self.clm_system.get_system_status)
         return status
     
-    async def _generate_report(self, args: Dict[str, Any]) -> Dict[str, Any]:
+    async def _generate_report(self, args: GenerateReportArgs) -> Dict[str, Any]:
         """Generate report tool"""
-        report_type = args.get("report_type", "comprehensive")
+        report_type = args.report_type
+        
+        if args.stream and report_type in ("comprehensive", "daily"):
+            return self._stream_report(report_type)
         
         if report_type == "comprehensive":
-            report = self.clm_system.generate_comprehensive_report()
+            report = await self._run_blocking(self._run_agent, self.clm_system.generate_comprehensive_report)
         elif report_type == "daily":
-            report = self.clm_system.daily_agent.run_daily_analysis()
+            report = await self._run_blocking(self._run_agent, self.clm_system.daily_agent.run_daily_analysis)
         else:
             return {"error": f"Unknown report type: {report_type}"}
         
         return {
             "report_type": report_type,
             "report": report,
-            "timestamp": datetime.now().isoformat()
+            "timestamp": self._now_iso()
         }
     
-    async def _detect_conflicts(self, args: Dict[str, Any]) -> Dict[str, Any]:
+    async def _stream_report(self, report_type: str):
+        """Yield a report one section at a time as each is produced, then a summary"""
+        clm_system = self.clm_system
+        sections = []
+        
+        if report_type == "comprehensive":
+            detector = clm_system.similarity_detector
+            daily_report = await self._run_blocking(self._run_agent, clm_system.daily_agent.run_daily_analysis)
+            sections.append("daily_analysis")
+            yield {"section": "daily_analysis", "data": daily_report}
+            
+            similarity_analysis = {
+                "statistics": await self._run_blocking(detector.get_similarity_statistics),
+                "duplicate_groups": len(await self._run_blocking(detector.find_duplicate_documents)),
+                "clusters": len(await self._run_blocking(detector.cluster_documents))
+            }
+            sections.append("similarity_analysis")
+            yield {"section": "similarity_analysis", "data": similarity_analysis}
+            
+            system_health = await self._run_blocking(clm_system.get_system_status)
+            sections.append("system_health")
+            yield {"section": "system_health", "data": system_health}
+        else:
+            # The daily agent builds its report in one pass; stream its sections
+            report = await self._run_blocking(self._run_agent, clm_system.daily_agent.run_daily_analysis)
+            for name, data in report.items():
+                sections.append(name)
+                yield {"section": name, "data": data}
+        
+        yield {
+            "report_type": report_type,
+            "sections": sections,
+            "timestamp": self._now_iso()
+        }
+    
+    async def _detect_conflicts(self, args: DetectConflictsArgs) -> Dict[str, Any]:
         """Detect conflicts tool"""
-        conflict_type = args.get("conflict_type", "all")
+        conflict_type = args.conflict_type
         
-        conflicts = self.clm_system.daily_agent._detect_conflicts()
+        # Scan once per corpus version; filtering by type is cheap
+        conflicts = await self._memoize(("conflicts",), self.clm_system.daily_agent._detect_conflicts)
         
         if conflict_type != "all":
             conflicts = [c for c in conflicts if c.get("type", "").lower() == conflict_type.lower()]
@@ -335,27 +1159,81 @@ class CLMMCPServer:
             "conflict_type": conflict_type,
             "conflicts": conflicts,
             "count": len(conflicts),
-            "timestamp": datetime.now().isoformat()
+            "timestamp": self._now_iso()
         }
     
-    async def _find_expiring_contracts(self, args: Dict[str, Any]) -> Dict[str, Any]:
+    async def _find_expiring_contracts(self, args: FindExpiringContractsArgs) -> Dict[str, Any]:
         """Find expiring contracts tool"""
-        days = args.get("days", 30)
-        
-        # Temporarily update the alert days
-        original_days = self.clm_system.daily_agent.expiration_alert_days
-        self.clm_system.daily_agent.expiration_alert_days = days
-        
-        expiring = self.clm_system.daily_agent._find_expiring_contracts()
+        days = args.days
         
-        # Restore original setting
-        self.clm_system.daily_agent.expiration_alert_days = original_days
+        expiring = await self._memoize(("expiring", days), lambda: self._scan_expiring_contracts(days))
         
         return {
             "days_ahead": days,
             "expiring_contracts": expiring,
             "count": len(expiring),
-            "timestamp": datetime.now().isoformat()
+            "timestamp": self._now_iso()
+        }
+    
+    def _scan_expiring_contracts(self, days: int) -> List[Dict[str, Any]]:
+        """Run the daily agent's expiration scan for a custom window"""
+        daily_agent = self.clm_system.daily_agent
+        
+        with self._agent_lock:
+            # Temporarily update the alert days
+            original_days = daily_agent.expiration_alert_days
+            daily_agent.expiration_alert_days = days
+            try:
+                return daily_agent._find_expiring_contracts()
+            finally:
+                # Restore original setting
+                daily_agent.expiration_alert_days = original_days
+    
+    async def _batch_execute(self, args: BatchExecuteArgs) -> Dict[str, Any]:
+        """Batch execute tool"""
+        operations = args.operations
+        semaphore = asyncio.Semaphore(max(1, args.maxConcurrent))
+        stop_on_error = args.stopOnError
+        timeout = args.timeoutMs / 1000
+        
+        async def run_operation(operation: Dict[str, Any]) -> Dict[str, Any]:
+            tool_name = operation.get("tool")
+            if tool_name == "batch_execute":
+                return {"error": "batch_execute cannot be nested"}
+            async with semaphore:
+                try:
+                    return await asyncio.wait_for(
+                        self.call_tool(tool_name, operation.get("arguments", {})), timeout
+                    )
+                except asyncio.TimeoutError:
+                    return {"error": f"Tool '{tool_name}' timed out after {timeout}s"}
+        
+        tasks = [asyncio.create_task(run_operation(operation)) for operation in operations]
+        if stop_on_error:
+            for finished in asyncio.as_completed(tasks):
+                outcome = await finished
+                if isinstance(outcome, dict) and "error" in outcome:
+                    for task in tasks:
+                        task.cancel()
+                    break
+        outcomes = await asyncio.gather(*tasks, return_exceptions=True)
+        
+        results = []
+        failed = 0
+        for operation, outcome in zip(operations, outcomes):
+            if isinstance(outcome, asyncio.CancelledError):
+                outcome = {"error": "Skipped after an earlier operation failed"}
+            elif isinstance(outcome, BaseException):
+                outcome = {"error": str(outcome)}
+            success = not (isinstance(outcome, dict) and "error" in outcome)
+            failed += not success
+            results.append({"tool": operation.get("tool"), "success": success, "result": outcome})
+        
+        return {
+            "results": results,
+            "count": len(results),
+            "failed": failed,
+            "timestamp": self._now_iso()
         }
 
 
@@ -366,8 +1244,46 @@ class MCPProtocol:
     def __init__(self, server: CLMMCPServer):
         self.server = server
     
-    async def handle_request(self, request: Dict[str, Any]) -> Dict[str, Any]:
-        """Handle incoming MCP requests"""
+    async def handle_request_bytes(self, request: Dict[str, Any],
+                                   notify: Optional[Callable[[Dict[str, Any]], None]] = None) -> bytes:
+        """Handle a request and return the serialized JSON-RPC response"""
+        method = request.get("method")
+        if method == "tools/list":
+            # Splice the pre-serialized catalog in rather than re-encoding it
+            return b"".join((
+                _RESPONSE_HEAD,
+                _dumps(request.get("id")),
+                b',"result":',
+                self.server._tools_list_json,
+                b"}"
+            ))
+        request_id = request.get("id")
+        if method != "tools/call":
+            return _error_bytes(request_id, -32601, f"Method not found: {method}")
+        
+        try:
+            result = await self._call_tool(request.get("params", {}), request_id, notify)
+            return b"".join((_RESPONSE_HEAD, _dumps(request_id), b',"result":', _dumps(result), b"}"))
+        except Exception as e:
+            return _error_bytes(request_id, -32603, f"Internal error: {str(e)}")
+    
+    async def _call_tool(self, params: Dict[str, Any], request_id: Any,
+                         notify: Optional[Callable[[Dict[str, Any]], None]]) -> Dict[str, Any]:
+        """Run a tools/call request, relaying streamed chunks as progress notifications"""
+        emit = None
+        if notify is not None:
+            def emit(chunk: Dict[str, Any]):
+                notify({
+                    "jsonrpc": "2.0",
+                    "method": "tools/progress",
+                    "params": {"id": request_id, "chunk": chunk}
+                })
+        
+        return await self.server.call_tool(params.get("name"), params.get("arguments", {}), emit)
+    
+    async def handle_request(self, request: Dict[str, Any],
+                             notify: Optional[Callable[[Dict[str, Any]], None]] = None) -> Dict[str, Any]:
+        """Handle incoming MCP requests; streamed tool chunks are sent through notify"""
         method = request.get("method")
         params = request.get("params", {})
         request_id = request.get("id")
@@ -382,10 +1298,7 @@ class MCPProtocol:
                 }
             
             elif method == "tools/call":
-                tool_name = params.get("name")
-                arguments = params.get("arguments", {})
-                
-                result = await self.server.call_tool(tool_name, arguments)
+                result = await self._call_tool(params, request_id, notify)
                 
                 return {
                     "jsonrpc": "2.0",
@@ -414,41 +1327,207 @@ class MCPProtocol:
             }
 
 
+def _error_bytes(request_id: Any, code: int, message: str) -> bytes:
+    """Serialize a JSON-RPC error response around the pre-encoded template"""
+    return b"".join((_RESPONSE_HEAD, _dumps(request_id), _ERROR_HEADS[code], _dumps(message), b"}}"))
+
+
+def _write_frame(data: bytes):
+    """Write one framed response to stdout"""
+    stdout = sys.stdout.buffer
+    if _LENGTH_PREFIXED:
+        stdout.write(_FRAME_HEADER.pack(len(data)))
+        stdout.write(data)
+    else:
+        # Two buffered writes instead of concatenating a copy of the response
+        stdout.write(data)
+        stdout.write(b"\n")
+    stdout.flush()
+
+
+def _notify(notification: Dict[str, Any]):
+    """Send a JSON-RPC notification ahead of the final response"""
+    _write_frame(_dumps(notification))
+
+
+def _oversized(length: int) -> ValueError:
+    """Error yielded in place of a request that exceeds _MAX_LINE_BYTES"""
+    return ValueError(f"Request of {length} bytes exceeds the {_MAX_LINE_BYTES} byte limit")
+
+
+async def _read_lines(reader: asyncio.StreamReader):
+    """Yield newline-delimited request bodies until EOF; oversized lines are skipped and yield a ValueError"""
+    skipped = 0
+    while True:
+        try:
+            line = await reader.readuntil(b"\n")
+        except asyncio.LimitOverrunError as e:
+            # Drop what was scanned and keep discarding until the line ends
+            await reader.readexactly(e.consumed)
+            skipped += e.consumed
+            continue
+        except asyncio.IncompleteReadError as e:
+            if skipped:
+                yield _oversized(skipped + len(e.partial))
+            elif e.partial:
+                yield e.partial
+            return
+        
+        if skipped:
+            yield _oversized(skipped + len(line))
+            skipped = 0
+        else:
+            yield line
+
+
+async def _read_frames(reader: asyncio.StreamReader):
+    """Yield length-prefixed request bodies until EOF; bad frames yield a ValueError instead"""
+    while True:
+        try:
+            header = await reader.readexactly(_FRAME_HEADER.size)
+        except asyncio.IncompleteReadError as e:
+            if e.partial:
+                yield ValueError(f"Truncated frame header of {len(e.partial)} bytes")
+            return
+        
+        length = _FRAME_HEADER.unpack(header)[0]
+        if length > _MAX_LINE_BYTES:
+            remaining = length
+            while remaining and (chunk := await reader.read(min(remaining, 1 << 20))):
+                remaining -= len(chunk)
+            yield _oversized(length)
+            continue
+        
+        try:
+            body = await reader.readexactly(length)
+        except asyncio.IncompleteReadError as e:
+            yield ValueError(f"Truncated frame: expected {length} bytes, got {len(e.partial)}")
+            return
+        yield body
+
+
+async def _read_blocking(stdin):
+    """Like _read_lines/_read_frames, for a blocking binary stream read on a worker thread"""
+    loop = asyncio.get_running_loop()
+    
+    async def read(method, size):
+        return await loop.run_in_executor(None, method, size)
+    
+    if not _LENGTH_PREFIXED:
+        while line := await read(stdin.readline, _MAX_LINE_BYTES + 1):
+            if len(line) <= _MAX_LINE_BYTES or line.endswith(b"\n"):
+                yield line
+                continue
+            length = len(line)
+            while (line := await read(stdin.readline, _MAX_LINE_BYTES + 1)) and not line.endswith(b"\n"):
+                length += len(line)
+            yield _oversized(length + len(line))
+        return
+    
+    while header := await read(stdin.read, _FRAME_HEADER.size):
+        if len(header) < _FRAME_HEADER.size:
+            yield ValueError(f"Truncated frame header of {len(header)} bytes")
+            return
+        
+        length = _FRAME_HEADER.unpack(header)[0]
+        if length > _MAX_LINE_BYTES:
+            remaining = length
+            while remaining and (chunk := await read(stdin.read, min(remaining, 1 << 20))):
+                remaining -= len(chunk)
+            yield _oversized(length)
+            continue
+        
+        body = await read(stdin.read, length)
+        if len(body) < length:
+            yield ValueError(f"Truncated frame: expected {length} bytes, got {len(body)}")
+            return
+        yield body
+
+
+async def _stdin_requests():
+    """
+    Yield raw request bodies from stdin without blocking the event loop.
+    A request that can't be read whole is yielded as a ValueError so it can be answered.
+    """
+    loop = asyncio.get_running_loop()
+    reader = asyncio.StreamReader(limit=_MAX_LINE_BYTES)
+    try:
+        await loop.connect_read_pipe(lambda: asyncio.StreamReaderProtocol(reader), sys.stdin)
+    except (ValueError, OSError):
+        # Regular files can't be watched as pipes; read them from a worker thread
+        reader = None
+    
+    if reader is None:
+        requests = _read_blocking(sys.stdin.buffer)
+    elif _LENGTH_PREFIXED:
+        requests = _read_frames(reader)
+    else:
+        requests = _read_lines(reader)
+    
+    async for body in requests:
+        yield body
+
+
+async def _handle_request(protocol: MCPProtocol, body: bytes):
+    """Parse, handle and answer one request"""
+    try:
+        request = _loads(body)
+    except Exception as e:
+        response = _error_bytes(None, -32700, f"Parse error: {str(e)}")
+    else:
+        try:
+            response = await protocol.handle_request_bytes(request, _notify)
+        except Exception as e:
+            request_id = request.get("id") if isinstance(request, dict) else None
+            response = _error_bytes(request_id, -32603, f"Internal error: {str(e)}")
+    # Writes are synchronous, so concurrent handlers can't interleave frames
+    _write_frame(response)
+
+
 # Main MCP Server
 async def main():
     """Main MCP server entry point"""
     server = CLMMCPServer()
     protocol = MCPProtocol(server)
     
-    # Initialize the system
-    await server.initialize_system()
+    # Initialize the system and warm it before accepting requests
+    if await server.initialize_system():
+        server.load_semantic_cache()
+        await server.warmup()
     
-    print("CLM MCP Server initialized successfully")
-    print("Available tools:")
+    # Binary frames must be the only thing on stdout, so the banner moves to stderr
+    banner = sys.stderr if _LENGTH_PREFIXED else sys.stdout
+    print("CLM MCP Server initialized successfully", file=banner)
+    print("Available tools:", file=banner)
     tools = await server.list_tools()
     for tool in tools:
-        print(f"  - {tool['name']}: {tool['description']}")
+        print(f"  - {tool['name']}: {tool['description']}", file=banner)
+    banner.flush()
     
-    # Handle requests from stdin (for MCP communication)
-    while True:
-        try:
-            line = input()
-            if line.strip():
-                request = json.loads(line)
-                response = await protocol.handle_request(request)
-                print(json.dumps(response))
-        except EOFError:
-            break
-        except Exception as e:
-            error_response = {
-                "jsonrpc": "2.0",
-                "id": None,
-                "error": {
-                    "code": -32700,
-                    "message": f"Parse error: {str(e)}"
-                }
-            }
-            print(json.dumps(error_response))
+    # SIGTERM (how CLMMCPClient stops the server) unwinds main so the cache gets saved
+    try:
+        asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, asyncio.current_task().cancel)
+    except (NotImplementedError, AttributeError):
+        pass  # No loop signal handlers on this platform
+    
+    # Handle requests from stdin (for MCP communication) concurrently
+    pending = set()
+    try:
+        async for body in _stdin_requests():
+            if isinstance(body, ValueError):
+                _write_frame(_error_bytes(None, -32700, f"Parse error: {body}"))
+            elif body.strip():
+                task = asyncio.create_task(_handle_request(protocol, body))
+                pending.add(task)
+                task.add_done_callback(pending.discard)
+        
+        if pending:
+            await asyncio.gather(*pending)
+    except asyncio.CancelledError:
+        pass
+    finally:
+        await server._embedder.aclose()
+        server.save_semantic_cache()
 
 
 if __name__ == "__main__":
@@ -2,10 +2,18 @@
 RAG (Retrieval-Augmented Generation) Pipeline for CLM Automation System.
 Handles document retrieval and AI-powered question answering.
 """
+import asyncio
 import os
-from typing import List, Dict, Any, Optional
+import re
+import threading
+import time
+from collections import OrderedDict
+from itertools import islice
+from typing import List, Dict, Any, Optional, Tuple, Iterator, AsyncIterator
 from datetime import datetime
 
+import numpy as np
+
 # Try to import required libraries
 try:
     from langchain.llms import OpenAI
@@ -14,6 +22,7 @@ try:
     from langchain.prompts import PromptTemplate
     from langchain.chains import RetrievalQA
     from langchain.embeddings import OpenAIEmbeddings
+    from langchain.callbacks import AsyncIteratorCallbackHandler
     LANGCHAIN_AVAILABLE = True
 except ImportError:
     LANGCHAIN_AVAILABLE = False
@@ -25,10 +34,197 @@ except ImportError:
             self.page_content = page_content
             self.metadata = metadata or {}
 
+# SIMD cosine kernels for the answer cache; NumPy's matrix-vector product is used otherwise
+try:
+    import simsimd
+    SIMSIMD_AVAILABLE = True
+except ImportError:
+    SIMSIMD_AVAILABLE = False
+
 from config import Config
 from document_processor import DocumentProcessor
 from loguru import logger
 
+# Every keyword the _answer_* helpers look for, matched in one case-insensitive pass
+_KEYWORD_PATTERN = re.compile(
+    r"expir|address|techcorp|global|client:|company:|vendor:|service provider:|\$",
+    re.IGNORECASE
+)
+_COMPANY_LABELS = ("client:", "company:", "vendor:", "service provider:")
+
+# Coarse int8 matches re-scored at full precision before the answer cache picks one
+_RERANK_CANDIDATES = 32
+
+# Streamed tokens are gathered and flushed at most this often (seconds)
+_STREAM_FLUSH_INTERVAL = 0.02
+
+# Mock answers remembered per (question category, retrieved chunk ids)
+_CATEGORY_ANSWER_CACHE_SIZE = 4096
+
+# Answer timestamps are reused for this long (seconds)
+_TIMESTAMP_RESOLUTION = 0.1
+
+# Prompt for the retrieval QA chain
+_QA_PROMPT_TEMPLATE = """
+You are a contract analysis assistant. Use the following pieces of context to answer the question about contracts.
+If you don't know the answer based on the context, say that you don't know.
+
+Context:
+{context}
+
+Question: {question}
+
+Answer: Provide a detailed answer based on the context. Always cite the source documents you used to generate your answer.
+Include document names and relevant sections when possible.
+
+Sources used:
+"""
+
+
+def _scan_keyword_lines(content: str) -> Dict[str, List[Tuple[int, int]]]:
+    """Map each keyword to the (start, end) offsets of the lines containing it, in order"""
+    hits: Dict[str, List[Tuple[int, int]]] = {}
+    line_start = line_end = -1
+    for match in _KEYWORD_PATTERN.finditer(content):
+        pos = match.start()
+        if pos > line_end:
+            line_start = content.rfind('\n', 0, pos) + 1
+            line_end = content.find('\n', pos)
+            if line_end == -1:
+                line_end = len(content)
+        spans = hits.setdefault(match.group().lower(), [])
+        if not spans or spans[-1][0] != line_start:
+            spans.append((line_start, line_end))
+    return hits
+
+
+def _company_address_lines(content: str, hits: Dict[str, List[Tuple[int, int]]]) -> Iterator[Tuple[str, str]]:
+    """Yield (company, line) for address lines mentioning TechCorp or Global Industries"""
+    techcorp_lines = {start for start, _ in hits.get('techcorp', ())}
+    global_lines = {start for start, _ in hits.get('global', ())}
+    for start, end in hits.get('address', ()):
+        if start in techcorp_lines:
+            yield 'TechCorp', content[start:end].strip()
+        elif start in global_lines:
+            yield 'Global Industries', content[start:end].strip()
+
+
+class AnswerCache:
+    """
+    LRU cache of answers keyed by (normalized question, max_results), with a
+    semantic tier that matches near-identical questions by embedding cosine.
+    Question embeddings are scanned as int8 with a per-row scale; the best
+    candidates are re-scored from a float16 copy.
+    """
+    
+    def __init__(self, capacity: int = 1024, threshold: float = 0.95):
+        self.capacity = capacity
+        self.threshold = threshold
+        # key -> (embedding row, result), least recently used first
+        self.entries: "OrderedDict[Tuple[str, int], Tuple[int, Dict[str, Any]]]" = OrderedDict()
+        self.row_keys: List[Optional[Tuple[str, int]]] = [None] * capacity
+        # Unit-normalized question embeddings, one row per entry; zero rows never match
+        self.keys: Optional[np.ndarray] = None  # int8, row i ~= keys[i] * scales[i]
+        self.scales = np.zeros(capacity, dtype=np.float32)
+        self.embeddings: Optional[np.ndarray] = None  # float16, for re-ranking
+        self.hits = 0
+        self.lookups = 0
+        # Tool calls run on several threads; entries, rows and key arrays change together
+        self._lock = threading.RLock()
+    
+    def clear(self):
+        """Drop every cached answer"""
+        with self._lock:
+            self.entries.clear()
+            self.row_keys = [None] * self.capacity
+            self.scales[:] = 0
+    
+    @staticmethod
+    def _quantize(embedding: np.ndarray) -> Tuple[np.ndarray, float]:
+        """Map a unit vector to int8 plus a scale"""
+        scale = float(np.abs(embedding).max()) / 127
+        if not scale:
+            return np.zeros(embedding.shape, dtype=np.int8), 0.0
+        return np.round(embedding / scale).astype(np.int8), scale
+    
+    def get(self, key: Tuple[str, int]) -> Optional[Dict[str, Any]]:
+        """Exact-match lookup"""
+        with self._lock:
+            self.lookups += 1
+            entry = self.entries.get(key)
+            if entry is None:
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+    
+    def _scores(self, embedding: np.ndarray) -> np.ndarray:
+        """Approximate cosine similarity of a unit query embedding against every occupied row"""
+        used = len(self.entries)
+        query, query_scale = self._quantize(embedding)
+        if SIMSIMD_AVAILABLE:
+            # Cosine is scale-invariant, so the int8 rows are compared directly
+            return 1.0 - np.asarray(simsimd.cdist(query[None, :], self.keys[:used], metric="cosine"))[0]
+        
+        # Accumulate in int32: int8 products summed over the dimension overflow int16
+        dots = self.keys[:used].astype(np.int32) @ query.astype(np.int32)
+        return dots * (self.scales[:used] * query_scale)
+    
+    def k_nearest(self, embedding: np.ndarray, k: int) -> List[Tuple[Tuple[str, int], float]]:
+        """The k cached questions most similar to an embedding, best first, with their scores"""
+        with self._lock:
+            if self.keys is None or not self.entries:
+                return []
+            
+            # Shortlist on the int8 scores, then re-score the shortlist in float32
+            scores = self._scores(embedding)
+            shortlist = min(max(k, _RERANK_CANDIDATES), len(scores))
+            candidates = np.argpartition(-scores, shortlist - 1)[:shortlist]
+            exact = self.embeddings[candidates].astype(np.float32) @ embedding
+            
+            order = np.argsort(-exact)[:k]
+            return [(self.row_keys[candidates[i]], float(exact[i])) for i in order]
+    
+    def get_similar(self, key: Tuple[str, int], embedding: np.ndarray) -> Optional[Dict[str, Any]]:
+        """Answer cached for the most similar question, if it clears the threshold"""
+        with self._lock:
+            nearest = self.k_nearest(embedding, 1)
+            if not nearest:
+                return None
+            
+            match, score = nearest[0]
+            # Answers retrieved with a different result limit are not interchangeable
+            if score < self.threshold or match[1] != key[1]:
+                return None
+            
+            self.entries.move_to_end(match)
+            self.hits += 1
+            return self.entries[match][1]
+    
+    def put(self, key: Tuple[str, int], result: Dict[str, Any], embedding: Optional[np.ndarray] = None):
+        """Store an answer, evicting the least recently used one when full"""
+        with self._lock:
+            if key in self.entries:
+                row = self.entries.pop(key)[0]
+            elif len(self.entries) >= self.capacity:
+                _, (row, _) = self.entries.popitem(last=False)
+            else:
+                # Rows fill in order until the cache is first full
+                row = len(self.entries)
+            
+            self.entries[key] = (row, result)
+            self.row_keys[row] = key
+            if embedding is not None and self.keys is None:
+                self.keys = np.zeros((self.capacity, embedding.shape[0]), dtype=np.int8)
+                self.embeddings = np.zeros((self.capacity, embedding.shape[0]), dtype=np.float16)
+            if self.keys is not None:
+                if embedding is None:
+                    self.keys[row], self.scales[row], self.embeddings[row] = 0, 0.0, 0
+                else:
+                    self.keys[row], self.scales[row] = self._quantize(embedding)
+                    self.embeddings[row] = embedding
+
+
 class RAGPipeline:
     """
     Retrieval-Augmented Generation pipeline for contract document analysis.
@@ -42,6 +238,14 @@ class RAGPipeline:
         self.embeddings = None
         self.qa_chain = None
         
+        # Answers and keyword scans are reused until the document index changes
+        self.answer_cache = AnswerCache(config.ANSWER_CACHE_SIZE, config.SEMANTIC_CACHE_THRESHOLD)
+        self._keyword_lines: Dict[str, Dict[str, List[Tuple[int, int]]]] = {}
+        self._category_answers: "OrderedDict[Tuple[str, Tuple[str, ...]], str]" = OrderedDict()
+        self._cache_version = document_processor.version
+        self._cache_lock = threading.Lock()  # Guards the version check and category LRU across tool threads
+        self._ts_cache: Tuple[float, str] = (float("-inf"), "")  # (monotonic time, ISO timestamp)
+        
         # Initialize AI components
         self._initialize_ai_components()
         
@@ -63,7 +267,8 @@ class RAGPipeline:
             self.llm = ChatOpenAI(
                 model_name="gpt-3.5-turbo",
                 temperature=0.1,
-                openai_api_key=self.config.OPENAI_API_KEY
+                openai_api_key=self.config.OPENAI_API_KEY,
+                streaming=True
             )
             
             # Initialize embeddings
@@ -86,24 +291,8 @@ class RAGPipeline:
         if not self.llm:
             return
         
-        # Define prompt template
-        prompt_template = """
-You are a contract analysis assistant. Use the following pieces of context to answer the question about contracts.
-If you don't know the answer based on the context, say that you don't know.
-
-Context:
-{context}
-
-Question: {question}
-
-Answer: Provide a detailed answer based on the context. Always cite the source documents you used to generate your answer.
-Include document names and relevant sections when possible.
-
-Sources used:
-"""
-
         PROMPT = PromptTemplate(
-            template=prompt_template,
+            template=_QA_PROMPT_TEMPLATE,
             input_variables=["context", "question"]
         )
         
@@ -136,32 +325,208 @@ Sources used:
             Dictionary containing answer, sources, and metadata
         """
         try:
+            key = self._answer_cache_key(question, max_results)
+            cached = self.answer_cache.get(key)
+            embedding = None
+            if cached is None and self.embeddings is not None:
+                embedding = self._embed_question(key[0])
+                if embedding is not None:
+                    cached = self.answer_cache.get_similar(key, embedding)
+            
+            if cached is not None:
+                return self._cache_hit(question, cached)
+            
             if self.qa_chain and LANGCHAIN_AVAILABLE:
                 # Use LangChain QA chain
-                result = self.qa_chain({"query": question})
-                
-                return {
-                    "answer": result["result"],
-                    "sources": self._extract_sources(result.get("source_documents", [])),
-                    "question": question,
-                    "timestamp": datetime.now().isoformat(),
-                    "model": "gpt-3.5-turbo"
-                }
+                result = self._format_chain_result(question, self.qa_chain({"query": question}))
             else:
                 # Use mock RAG pipeline
-                return self._mock_ask_question(question, max_results)
+                result = self._mock_ask_question(question, max_results, key[0])
+            
+            self.answer_cache.put(key, result, embedding)
+            return result
                 
         except Exception as e:
-            logger.error(f"Error asking question: {e}")
-            return {
-                "answer": f"Error processing question: {str(e)}",
-                "sources": [],
-                "question": question,
-                "timestamp": datetime.now().isoformat(),
-                "model": "mock"
-            }
+            return self._error_result(question, e)
+
+    async def aask_question(self, question: str, max_results: int = 5,
+                            embedding: Optional[np.ndarray] = None) -> Dict[str, Any]:
+        """
+        Async variant of ask_question.
+        The QA chain is awaited natively; blocking work runs in a worker thread.
+        A unit-normalized question embedding from embed_batch may be passed in.
+        """
+        try:
+            key, cached, embedding = await self._alookup_answer(question, max_results, embedding)
+            if cached is not None:
+                return self._cache_hit(question, cached)
+            
+            if self.qa_chain and LANGCHAIN_AVAILABLE:
+                result = self._format_chain_result(question, await self.qa_chain.acall({"query": question}))
+            else:
+                result = await asyncio.to_thread(self._mock_ask_question, question, max_results, key[0])
+            
+            self.answer_cache.put(key, result, embedding)
+            return result
+        
+        except Exception as e:
+            return self._error_result(question, e)
+
+    async def stream_question(self, question: str, max_results: int = 5) -> AsyncIterator[str]:
+        """
+        Stream the answer to a question in chunks as the LLM produces it.
+        Tokens are flushed at most every 20ms; the full answer is cached when done.
+        """
+        if not (self.qa_chain and LANGCHAIN_AVAILABLE):
+            result = await self.aask_question(question, max_results)
+            yield result["answer"]
+            return
+        
+        key, cached, embedding = await self._alookup_answer(question, max_results)
+        if cached is not None:
+            yield self._cache_hit(question, cached)["answer"]
+            return
+        
+        handler = AsyncIteratorCallbackHandler()
+        task = asyncio.create_task(self.qa_chain.acall({"query": question}, callbacks=[handler]))
+        # Unblock the token iterator if the chain fails before the LLM finishes
+        task.add_done_callback(lambda _: handler.done.set())
+        
+        try:
+            loop = asyncio.get_running_loop()
+            buffer = []
+            flushed_at = loop.time()
+            async for token in handler.aiter():
+                buffer.append(token)
+                if loop.time() - flushed_at >= _STREAM_FLUSH_INTERVAL:
+                    yield "".join(buffer)
+                    buffer.clear()
+                    flushed_at = loop.time()
+            if buffer:
+                yield "".join(buffer)
+            
+            result = self._format_chain_result(question, await task)
+            self.answer_cache.put(key, result, embedding)
+        finally:
+            # The consumer may stop reading early
+            task.cancel()
+
+    async def ask_questions(self, questions: List[str], max_results: int = 5,
+                            max_concurrency: int = 8) -> List[Dict[str, Any]]:
+        """Answer several questions concurrently, at most max_concurrency in flight"""
+        semaphore = asyncio.Semaphore(max_concurrency)
+        embeddings: List[Optional[np.ndarray]] = [None] * len(questions)
+        
+        # Embed every question the exact cache cannot answer in one batched request
+        if self.embeddings is not None:
+            pending = [i for i, question in enumerate(questions)
+                       if self._answer_cache_key(question, max_results) not in self.answer_cache.entries]
+            if pending:
+                try:
+                    vectors = await asyncio.to_thread(
+                        self.embed_batch, [questions[i].strip().lower() for i in pending]
+                    )
+                    for i, vector in zip(pending, vectors):
+                        embeddings[i] = vector if vector.any() else None
+                except Exception as e:
+                    logger.warning(f"Could not batch-embed questions for the answer cache: {e}")
+        
+        async def ask(question: str, embedding: Optional[np.ndarray]) -> Dict[str, Any]:
+            async with semaphore:
+                return await self.aask_question(question, max_results, embedding)
+        
+        return await asyncio.gather(*(ask(question, embedding) for question, embedding in zip(questions, embeddings)))
+
+    def embed_batch(self, texts: List[str], batch_size: int = 256) -> np.ndarray:
+        """
+        Embed many texts with one embeddings request per batch_size texts.
+        Returns unit-normalized float32 rows; texts with a zero embedding stay zero.
+        """
+        if self.embeddings is None:
+            raise RuntimeError("Embeddings are not configured")
+        if not texts:
+            return np.zeros((0, 0), dtype=np.float32)
+        
+        vectors = []
+        for start in range(0, len(texts), batch_size):
+            vectors.extend(self.embeddings.embed_documents(texts[start:start + batch_size]))
+        
+        matrix = np.asarray(vectors, dtype=np.float32)
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        return np.divide(matrix, norms, out=np.zeros_like(matrix), where=norms > 0)
+
+    async def _alookup_answer(self, question: str, max_results: int, embedding: Optional[np.ndarray] = None
+                              ) -> Tuple[Tuple[str, int], Optional[Dict[str, Any]], Optional[np.ndarray]]:
+        """Cache key, cached answer (exact, then semantic) and the question embedding used"""
+        key = self._answer_cache_key(question, max_results)
+        cached = self.answer_cache.get(key)
+        if cached is None and embedding is None and self.embeddings is not None:
+            embedding = await asyncio.to_thread(self._embed_question, key[0])
+        if cached is None and embedding is not None:
+            cached = self.answer_cache.get_similar(key, embedding)
+        return key, cached, embedding
+
+    def _answer_cache_key(self, question: str, max_results: int) -> Tuple[str, int]:
+        """Normalized cache key, dropping cached answers first if the index changed"""
+        self._sync_caches()
+        return question.strip().lower(), max_results
+
+    def _sync_caches(self):
+        """Drop everything derived from the index once the document processor reindexes"""
+        with self._cache_lock:
+            if self._cache_version != self.document_processor.version:
+                self.answer_cache.clear()
+                self._keyword_lines.clear()
+                self._category_answers.clear()
+                self._cache_version = self.document_processor.version
+
+    def _cache_hit(self, question: str, cached: Dict[str, Any]) -> Dict[str, Any]:
+        """Return a cached answer for this question, logging the hit rate"""
+        cache = self.answer_cache
+        logger.info(f"Answer cache hit (hit rate {cache.hits / cache.lookups:.1%} over {cache.lookups} questions)")
+        return {**cached, "question": question}
+
+    def _format_chain_result(self, question: str, result: Dict[str, Any]) -> Dict[str, Any]:
+        """Shape a QA chain result like the rest of the pipeline's answers"""
+        return {
+            "answer": result["result"],
+            "sources": self._extract_sources(result.get("source_documents", [])),
+            "question": question,
+            "timestamp": self._now_iso(),
+            "model": "gpt-3.5-turbo"
+        }
+
+    def _error_result(self, question: str, error: Exception) -> Dict[str, Any]:
+        """Answer returned when a question could not be processed"""
+        logger.error(f"Error asking question: {error}")
+        return {
+            "answer": f"Error processing question: {str(error)}",
+            "sources": [],
+            "question": question,
+            "timestamp": self._now_iso(),
+            "model": "mock"
+        }
+
+    def _now_iso(self) -> str:
+        """Current time in ISO format, refreshed at most every _TIMESTAMP_RESOLUTION seconds"""
+        now = time.monotonic()
+        if now - self._ts_cache[0] > _TIMESTAMP_RESOLUTION:
+            self._ts_cache = (now, datetime.now().isoformat())
+        return self._ts_cache[1]
 
-    def _mock_ask_question(self, question: str, max_results: int) -> Dict[str, Any]:
+    def _embed_question(self, question: str) -> Optional[np.ndarray]:
+        """Unit-normalized embedding of a question, or None if it cannot be embedded"""
+        try:
+            vector = np.asarray(self.embeddings.embed_query(question), dtype=np.float32)
+        except Exception as e:
+            logger.warning(f"Could not embed question for the answer cache: {e}")
+            return None
+        
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm > 0 else None
+
+    def _mock_ask_question(self, question: str, max_results: int,
+                           question_lower: Optional[str] = None) -> Dict[str, Any]:
         """Mock question answering when AI components are not available"""
         # Search for relevant documents
         search_results = self.document_processor.search_documents(question, max_results)
@@ -171,15 +536,12 @@ Sources used:
                 "answer": "I couldn't find any relevant information to answer your question.",
                 "sources": [],
                 "question": question,
-                "timestamp": datetime.now().isoformat(),
+                "timestamp": self._now_iso(),
                 "model": "mock"
             }
         
-        # Create a simple answer based on retrieved content
-        context = "\n\n".join([result['content'] for result in search_results])
-        
         # Simple keyword-based answer generation
-        answer = self._generate_simple_answer(question, context, search_results)
+        answer = self._generate_simple_answer(question, search_results, question_lower)
         
         # Extract sources
         sources = self._extract_sources_from_results(search_results)
@@ -188,65 +550,89 @@ Sources used:
             "answer": answer,
             "sources": sources,
             "question": question,
-            "timestamp": datetime.now().isoformat(),
+            "timestamp": self._now_iso(),
             "model": "mock"
         }
 
-    def _generate_simple_answer(self, question: str, context: str, search_results: List[Dict]) -> str:
-        """Generate a simple answer based on context and search results"""
-        question_lower = question.lower()
+    def _generate_simple_answer(self, question: str, search_results: List[Dict],
+                                question_lower: Optional[str] = None) -> str:
+        """Generate a simple answer based on the search results"""
+        # Callers that already normalized the question pass it in rather than lowercasing again
+        if question_lower is None:
+            question_lower = question.lower()
         
         # Check for specific question types
-        if "expir" in question_lower or "expir" in question_lower:
-            return self._answer_expiration_question(context, search_results)
-        elif "conflict" in question_lower or "conflict" in question_lower:
-            return self._answer_conflict_question(context, search_results)
+        if "expir" in question_lower:
+            answer_category = self._answer_expiration_question
+        elif "conflict" in question_lower:
+            answer_category = self._answer_conflict_question
         elif "address" in question_lower:
-            return self._answer_address_question(context, search_results)
+            answer_category = self._answer_address_question
         elif "company" in question_lower or "party" in question_lower:
-            return self._answer_company_question(context, search_results)
+            answer_category = self._answer_company_question
         elif "amount" in question_lower or "price" in question_lower or "cost" in question_lower:
-            return self._answer_financial_question(context, search_results)
+            answer_category = self._answer_financial_question
         else:
-            return self._answer_general_question(question, context, search_results)
+            return self._answer_general_question(question, search_results, question_lower)
+        
+        # Category answers depend only on the retrieved chunks, not on the question's wording
+        self._sync_caches()
+        key = (answer_category.__name__, tuple(result['id'] for result in search_results))
+        with self._cache_lock:
+            answer = self._category_answers.get(key)
+            if answer is not None:
+                self._category_answers.move_to_end(key)
+                return answer
+        
+        # One keyword pass per chunk, remembered across questions; each helper reads only its own keywords' lines
+        line_hits = []
+        for result in search_results:
+            hits = self._keyword_lines.get(result['id'])
+            if hits is None:
+                hits = self._keyword_lines[result['id']] = _scan_keyword_lines(result['content'])
+            line_hits.append(hits)
+        
+        answer = answer_category(search_results, line_hits)
+        with self._cache_lock:
+            self._category_answers[key] = answer
+            if len(self._category_answers) > _CATEGORY_ANSWER_CACHE_SIZE:
+                self._category_answers.popitem(last=False)
+        return answer
 
-    def _answer_expiration_question(self, context: str, search_results: List[Dict]) -> str:
+    def _answer_expiration_question(self, search_results: List[Dict],
+                                    line_hits: List[Dict[str, List[Tuple[int, int]]]]) -> str:
         """Answer questions about contract expiration"""
         answer = "Based on the contract documents, here are the expiration-related information:\n\n"
         
-        for result in search_results:
+        for result, hits in zip(search_results, line_hits):
             doc_name = result['metadata'].get('file_name', 'Unknown')
             content = result['content']
             
             # Look for expiration dates
-            if 'expir' in content.lower():
+            spans = hits.get('expir')
+            if spans:
                 answer += f"• {doc_name}: Contains expiration information\n"
                 # Extract relevant lines
-                lines = content.split('\n')
-                for line in lines:
-                    if 'expir' in line.lower():
-                        answer += f"  - {line.strip()}\n"
+                for start, end in spans:
+                    answer += f"  - {content[start:end].strip()}\n"
         
         return answer
 
-    def _answer_conflict_question(self, context: str, search_results: List[Dict]) -> str:
+    def _answer_conflict_question(self, search_results: List[Dict],
+                                  line_hits: List[Dict[str, List[Tuple[int, int]]]]) -> str:
         """Answer questions about conflicts"""
         answer = "I found the following potential conflicts in the contract documents:\n\n"
         
         # Check for address conflicts
         addresses = {}
-        for result in search_results:
+        for result, hits in zip(search_results, line_hits):
             doc_name = result['metadata'].get('file_name', 'Unknown')
-            content = result['content']
             
             # Extract addresses
-            lines = content.split('\n')
-            for line in lines:
-                if 'address' in line.lower() and ('techcorp' in line.lower() or 'global' in line.lower()):
-                    company = 'TechCorp' if 'techcorp' in line.lower() else 'Global Industries'
-                    if company not in addresses:
-                        addresses[company] = []
-                    addresses[company].append((doc_name, line.strip()))
+            for company, line in _company_address_lines(result['content'], hits):
+                if company not in addresses:
+                    addresses[company] = []
+                addresses[company].append((doc_name, line))
         
         for company, addr_list in addresses.items():
             if len(addr_list) > 1:
@@ -256,69 +642,71 @@ Sources used:
         
         return answer
 
-    def _answer_address_question(self, context: str, search_results: List[Dict]) -> str:
+    def _answer_address_question(self, search_results: List[Dict],
+                                 line_hits: List[Dict[str, List[Tuple[int, int]]]]) -> str:
         """Answer questions about addresses"""
         answer = "Here are the addresses found in the contract documents:\n\n"
         
-        for result in search_results:
+        for result, hits in zip(search_results, line_hits):
             doc_name = result['metadata'].get('file_name', 'Unknown')
-            content = result['content']
             
-            lines = content.split('\n')
-            for line in lines:
-                if 'address' in line.lower() and ('techcorp' in line.lower() or 'global' in line.lower()):
-                    answer += f"• {doc_name}: {line.strip()}\n"
+            for _, line in _company_address_lines(result['content'], hits):
+                answer += f"• {doc_name}: {line}\n"
         
         return answer
 
-    def _answer_company_question(self, context: str, search_results: List[Dict]) -> str:
+    def _answer_company_question(self, search_results: List[Dict],
+                                 line_hits: List[Dict[str, List[Tuple[int, int]]]]) -> str:
         """Answer questions about companies"""
         answer = "Here are the companies mentioned in the contract documents:\n\n"
         
         companies = set()
-        for result in search_results:
+        for result, hits in zip(search_results, line_hits):
             content = result['content']
-            lines = content.split('\n')
-            for line in lines:
-                if any(keyword in line.lower() for keyword in ['client:', 'company:', 'vendor:', 'service provider:']):
-                    companies.add(line.strip())
+            for label in _COMPANY_LABELS:
+                for start, end in hits.get(label, ()):
+                    companies.add(content[start:end].strip())
         
         for company in sorted(companies):
             answer += f"• {company}\n"
         
         return answer
 
-    def _answer_financial_question(self, context: str, search_results: List[Dict]) -> str:
+    def _answer_financial_question(self, search_results: List[Dict],
+                                   line_hits: List[Dict[str, List[Tuple[int, int]]]]) -> str:
         """Answer questions about financial information"""
         answer = "Here are the financial details found in the contract documents:\n\n"
         
-        for result in search_results:
+        for result, hits in zip(search_results, line_hits):
             doc_name = result['metadata'].get('file_name', 'Unknown')
             content = result['content']
             
             # Look for monetary values
-            lines = content.split('\n')
-            for line in lines:
-                if '$' in line:
-                    answer += f"• {doc_name}: {line.strip()}\n"
+            for start, end in hits.get('$', ()):
+                answer += f"• {doc_name}: {content[start:end].strip()}\n"
         
         return answer
 
-    def _answer_general_question(self, question: str, context: str, search_results: List[Dict]) -> str:
+    def _answer_general_question(self, question: str, search_results: List[Dict],
+                                 question_lower: Optional[str] = None) -> str:
         """Answer general questions"""
         answer = f"Based on the contract documents, here's what I found regarding '{question}':\n\n"
         
+        # Lowercase each sentence once and search it for every question word in one pass
+        words = (question.lower() if question_lower is None else question_lower).split()
+        word_pattern = re.compile("|".join(map(re.escape, words))) if words else None
+        
         for i, result in enumerate(search_results, 1):
             doc_name = result['metadata'].get('file_name', 'Unknown')
             content = result['content']
             
             answer += f"{i}. {doc_name}:\n"
-            # Extract relevant sentences
-            sentences = content.split('.')
-            relevant_sentences = [s.strip() for s in sentences if any(word in s.lower() for word in question.lower().split())]
+            # Extract relevant sentences; only the first two are shown, so stop looking after them
+            sentences = content.split('.') if word_pattern else []
+            relevant_sentences = list(islice((s.strip() for s in sentences if word_pattern.search(s.lower())), 2))
             
             if relevant_sentences:
-                answer += f"   {'. '.join(relevant_sentences[:2])}.\n\n"
+                answer += f"   {'. '.join(relevant_sentences)}.\n\n"
             else:
                 answer += f"   {content[:200]}...\n\n"
         
@@ -427,11 +815,11 @@ if __name__ == "__main__":
     print("Testing RAG Pipeline:")
     print("=" * 50)
     
-    for question in test_questions:
+    results = asyncio.run(rag.ask_questions(test_questions))
+    for question, result in zip(test_questions, results):
         print(f"\nQuestion: {question}")
         print("-" * 30)
         
-        result = rag.ask_question(question)
         print(f"Answer: {result['answer']}")
         
         if result['sources']:
@@ -3,6 +3,7 @@ Virtual Environment Setup Script for CLM Automation System
 Creates and configures a virtual environment with all dependencies
 """
 import os
+import shutil
 import subprocess
 import sys
 import platform
@@ -18,10 +19,7 @@ def create_virtual_environment():
         response = input("Do you want to recreate it? (y/N): ").strip().lower()
         if response == 'y':
             print(f"🗑️  Removing existing virtual environment...")
-            if platform.system() == "Windows":
-                subprocess.run(f"rmdir /s /q {venv_name}", shell=True)
-            else:
-                subprocess.run(f"rm -rf {venv_name}", shell=True)
+            shutil.rmtree(venv_name, ignore_errors=True)
         else:
             print("✅ Using existing virtual environment")
             return venv_name
@@ -53,25 +51,29 @@ def install_packages(venv_name):
         python_exe = f"{venv_name}/bin/python"
         pip_exe = f"{venv_name}/bin/pip"
     
+    ai_packages = [
+        "langchain",
+        "langchain-community", 
+        "langchain-openai",
+        "openai",
+        "chromadb"
+    ]
+    
     try:
-        # Upgrade pip
-        print("⬆️  Upgrading pip...")
-        subprocess.check_call([python_exe, "-m", "pip", "install", "--upgrade", "pip"])
-        
-        # Install core packages
-        print("📦 Installing core packages...")
-        subprocess.check_call([pip_exe, "install", "-r", "requirements_simple.txt"])
-        
-        # Install AI/ML packages
-        print("🤖 Installing AI/ML packages...")
-        ai_packages = [
-            "langchain",
-            "langchain-community", 
-            "langchain-openai",
-            "openai",
-            "chromadb"
-        ]
-        subprocess.check_call([pip_exe, "install"] + ai_packages)
+        # Core and AI/ML packages are resolved together in a single install
+        uv_exe = shutil.which("uv")
+        if uv_exe:
+            print("📦 Installing core and AI/ML packages with uv...")
+            subprocess.check_call([uv_exe, "pip", "install", "--python", python_exe,
+                                   "-r", "requirements_simple.txt"] + ai_packages)
+        else:
+            # Upgrade pip
+            print("⬆️  Upgrading pip...")
+            subprocess.check_call([python_exe, "-m", "pip", "install", "--upgrade", "pip"])
+            
+            print("📦 Installing core and AI/ML packages...")
+            subprocess.check_call([pip_exe, "--no-input", "install", "--prefer-binary",
+                                   "-r", "requirements_simple.txt"] + ai_packages)
         
         print("✅ All packages installed successfully!")
         return True
@@ -4,40 +4,101 @@ Implements semantic similarity search and document comparison features.
 """
 import os
 import json
+import hashlib
+import multiprocessing
+import pickle
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
 from typing import List, Dict, Any, Tuple, Optional
 from datetime import datetime
 import numpy as np
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
-from sklearn.cluster import KMeans
+import sklearn
+from sklearn.base import BaseEstimator, TransformerMixin
+from sklearn.feature_extraction.text import HashingVectorizer, TfidfTransformer
+from sklearn.pipeline import make_pipeline
+from sklearn.cluster import MiniBatchKMeans
 import re
 
+# SIMD cosine kernels for query scoring; a sparse dot product is used otherwise
+try:
+    import simsimd
+    SIMSIMD_AVAILABLE = True
+except ImportError:
+    SIMSIMD_AVAILABLE = False
+
+# Vectorized search queries kept per detector, least recently used evicted first
+_QUERY_CACHE_SIZE = 1024
+
+# Rows of the similarity matrix reduced at a time when computing statistics
+_STATS_BLOCK_ROWS = 512
+
+# Below this many documents, cleaning in-process beats the cost of starting worker processes
+_PARALLEL_CLEAN_MIN_DOCS = 256
+
 from config import Config
 from document_processor import DocumentProcessor
 from loguru import logger
 
+class _MostFrequentColumns(TransformerMixin, BaseEstimator):
+    """Keep the max_features columns with the highest total counts, like TfidfVectorizer's max_features"""
+    
+    def __init__(self, max_features: int = 1000):
+        self.max_features = max_features
+    
+    def fit(self, X, y=None):
+        totals = np.asarray(X.sum(axis=0)).ravel()
+        top = np.argsort(-totals, kind='stable')[:self.max_features]
+        self.columns_ = np.sort(top)
+        return self
+    
+    def transform(self, X):
+        return X[:, self.columns_]
+
 class DocumentSimilarityDetector:
     """
     Advanced document similarity detection and analysis.
     Uses multiple similarity metrics and clustering techniques.
     """
     
+    _WHITESPACE_RE = re.compile(r'\s+')
+    _SPECIAL_CHARS_RE = re.compile(r'[^\w\s.,;:!?-]')
+    
     def __init__(self, config: Config, document_processor: DocumentProcessor):
         self.config = config
         self.document_processor = document_processor
-        self.vectorizer = TfidfVectorizer(
-            max_features=1000,
-            stop_words='english',
-            ngram_range=(1, 2)
+        # Hashed term counts skip building a vocabulary; the most frequent buckets are kept as features
+        self.vectorizer = make_pipeline(
+            HashingVectorizer(
+                n_features=2**18,
+                stop_words='english',
+                ngram_range=(1, 2),
+                alternate_sign=False,
+                norm=None,
+                dtype=np.float32
+            ),
+            _MostFrequentColumns(max_features=1000),
+            TfidfTransformer(norm='l2')  # Unit rows: cosine similarity is a plain dot product
         )
         self.document_vectors = None
         self.document_texts = []
         self.document_metadata = []
+        self._previews: List[str] = []  # Result content_preview per document
+        self._dense_vectors = None  # L2-normalized float32 copy of document_vectors
+        self._sim_matrix = None  # Pairwise cosine matrix, computed on first use
+        self._query_vectors: "OrderedDict[str, Any]" = OrderedDict()  # Raw query -> TF-IDF row
+        self._query_lock = threading.Lock()  # Searches may run on several threads at once
+        self._doc_id_to_index: Dict[str, int] = {}
         
         logger.info("Document Similarity Detector initialized successfully")
 
-    def build_similarity_index(self) -> bool:
-        """Build the similarity index for all documents"""
+    def build_similarity_index(self, num_workers: Optional[int] = None, use_cache: bool = True) -> bool:
+        """
+        Build the similarity index for all documents.
+        
+        Large corpora are cleaned on num_workers processes (defaults to the CPU count).
+        With use_cache, an index saved for the same corpus is loaded instead of rebuilt.
+        """
         try:
             logger.info("Building document similarity index...")
             
@@ -47,18 +108,28 @@ class DocumentSimilarityDetector:
                 logger.error("No documents found for similarity indexing")
                 return False
             
-            # Prepare texts and metadata
-            self.document_texts = []
-            self.document_metadata = []
-            
-            for doc in all_docs:
-                # Clean and prepare text
-                clean_text = self._clean_text(doc['content'])
-                self.document_texts.append(clean_text)
-                self.document_metadata.append(doc['metadata'])
+            corpus_key = self._corpus_key(all_docs)
+            if use_cache and self.load_index(corpus_key=corpus_key):
+                return True
             
-            # Create TF-IDF vectors
+            # Prepare texts and metadata
+            contents = [doc['content'] for doc in all_docs]
+            self.document_metadata = [doc['metadata'] for doc in all_docs]
+            
+            if len(contents) < _PARALLEL_CLEAN_MIN_DOCS:
+                self.document_texts = [self._clean_text(content) for content in contents]
+            else:
+                # Spawned, not forked: callers such as the MCP server have other threads holding locks
+                with ProcessPoolExecutor(max_workers=num_workers or os.cpu_count() or 1,
+                                         mp_context=multiprocessing.get_context("spawn")) as executor:
+                    self.document_texts = list(executor.map(self._clean_text, contents, chunksize=64))
+            
+            # Create TF-IDF vectors; the vectorizer L2-normalizes rows, so cosine is a plain dot product
             self.document_vectors = self.vectorizer.fit_transform(self.document_texts)
+            self._prepare_index()
+            
+            if use_cache:
+                self.save_index(corpus_key=corpus_key)
             
             logger.info(f"Similarity index built for {len(all_docs)} documents")
             return True
@@ -67,13 +138,98 @@ class DocumentSimilarityDetector:
             logger.error(f"Error building similarity index: {e}")
             return False
 
-    def _clean_text(self, text: str) -> str:
-        """Clean and preprocess text for similarity analysis"""
+    def _prepare_index(self):
+        """Derive the lookup structures from freshly built or loaded document vectors"""
+        self._dense_vectors = self.document_vectors.toarray()
+        self._sim_matrix = None
+        self._query_vectors.clear()
+        self._previews = [text[:200] + "..." for text in self.document_texts]
+        
+        # First occurrence wins, as with the linear scan this replaces
+        self._doc_id_to_index = {}
+        for i, metadata in enumerate(self.document_metadata):
+            self._doc_id_to_index.setdefault(metadata.get('doc_id'), i)
+
+    def _index_path(self) -> str:
+        """File the similarity index is persisted to"""
+        return os.path.join(self.config.SIMILARITY_INDEX_DIRECTORY, "similarity_index.pkl")
+
+    def _corpus_key(self, all_docs: List[Dict[str, Any]]) -> str:
+        """Identify a corpus and vectorizer setup; a saved index is only valid for the same one"""
+        digest = hashlib.blake2b(digest_size=16)
+        # Pickles only load reliably into the scikit-learn version that wrote them
+        digest.update(sklearn.__version__.encode())
+        digest.update(b"\0")
+        # Every parameter of every pipeline step, defaults included
+        params = sorted((name, repr(value)) for name, value in self.vectorizer.get_params(deep=True).items())
+        digest.update(repr(params).encode())
+        for doc in all_docs:
+            digest.update(str(doc['metadata'].get('doc_id', '')).encode())
+            digest.update(b"\0")
+            digest.update(doc['content'].encode())
+            digest.update(b"\0")
+        return digest.hexdigest()
+
+    def save_index(self, path: Optional[str] = None, corpus_key: Optional[str] = None) -> bool:
+        """Persist the built index so later runs can skip rebuilding it"""
+        if self.document_vectors is None:
+            return False
+        
+        try:
+            path = path or self._index_path()
+            state = {
+                'corpus_key': corpus_key,
+                'vectorizer': self.vectorizer,
+                'document_vectors': self.document_vectors,
+                'document_texts': self.document_texts,
+                'document_metadata': self.document_metadata
+            }
+            
+            # Write beside the target and swap it in, so a crash never leaves a torn file
+            os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+            temp_path = path + ".tmp"
+            with open(temp_path, 'wb') as f:
+                pickle.dump(state, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(temp_path, path)
+            return True
+            
+        except Exception as e:
+            logger.warning(f"Could not save similarity index: {e}")
+            return False
+
+    def load_index(self, path: Optional[str] = None, corpus_key: Optional[str] = None) -> bool:
+        """Load a saved index; with corpus_key, only if it was built for that corpus"""
+        path = path or self._index_path()
+        if not os.path.exists(path):
+            return False
+        
+        try:
+            with open(path, 'rb') as f:
+                state = pickle.load(f)
+            if corpus_key is not None and state['corpus_key'] != corpus_key:
+                return False
+            
+            self.vectorizer = state['vectorizer']
+            self.document_vectors = state['document_vectors']
+            self.document_texts = state['document_texts']
+            self.document_metadata = state['document_metadata']
+            self._prepare_index()
+            
+            logger.info(f"Similarity index loaded for {len(self.document_metadata)} documents")
+            return True
+            
+        except Exception as e:
+            logger.warning(f"Could not load similarity index: {e}")
+            return False
+
+    @staticmethod
+    def _clean_text(text: str) -> str:
+        """Clean and preprocess text for similarity analysis (static, so worker processes can pickle it)"""
         # Remove extra whitespace
-        text = re.sub(r'\s+', ' ', text)
+        text = DocumentSimilarityDetector._WHITESPACE_RE.sub(' ', text)
         
         # Remove special characters but keep basic punctuation
-        text = re.sub(r'[^\w\s.,;:!?-]', '', text)
+        text = DocumentSimilarityDetector._SPECIAL_CHARS_RE.sub('', text)
         
         # Convert to lowercase
         text = text.lower()
@@ -105,38 +261,118 @@ class DocumentSimilarityDetector:
                 logger.error(f"Document {doc_id} not found")
                 return []
             
-            # Calculate similarities
-            similarities = self._calculate_similarities(doc_index)
-            
-            # Get top similar documents
-            similar_docs = []
-            for i, similarity in enumerate(similarities):
-                if i != doc_index and similarity >= similarity_threshold:
-                    similar_docs.append({
-                        'document_id': self.document_metadata[i].get('doc_id', f'doc_{i}'),
-                        'file_name': self.document_metadata[i].get('file_name', 'Unknown'),
-                        'contract_type': self.document_metadata[i].get('contract_type', 'Unknown'),
-                        'companies': self.document_metadata[i].get('companies', []),
-                        'similarity_score': float(similarity),
-                        'content_preview': self.document_texts[i][:200] + "...",
-                        'metadata': self.document_metadata[i]
-                    })
+            # Score against every document
+            candidates = np.arange(self.document_vectors.shape[0])
+            return self.rank_candidates(doc_index, candidates, n_results, similarity_threshold)
             
-            # Sort by similarity score (descending)
-            similar_docs.sort(key=lambda x: x['similarity_score'], reverse=True)
+        except Exception as e:
+            logger.error(f"Error finding similar documents: {e}")
+            return []
+
+    def rank_candidates(self, doc_index: int, candidates: np.ndarray, n_results: int = 5,
+                        similarity_threshold: float = 0.3) -> List[Dict[str, Any]]:
+        """Score candidate documents against one document and return the closest matches"""
+        candidates = candidates[candidates != doc_index]
+        if candidates.size == 0:
+            return []
+        
+        # Calculate similarities
+        similarities = self._cosine_scores(self.document_vectors[doc_index], candidates)
+        
+        return self._top_matches(candidates, similarities, n_results, similarity_threshold)
+
+    def find_similar_documents_batch(self, doc_ids: List[str], n_results: int = 5,
+                                     similarity_threshold: float = 0.3) -> List[List[Dict[str, Any]]]:
+        """
+        Find similar documents for several reference documents with one matrix product.
+        
+        Returns one result list per doc_id, in order; unknown doc_ids get an empty list.
+        """
+        try:
+            if self.document_vectors is None:
+                logger.warning("Similarity index not built, building now...")
+                if not self.build_similarity_index():
+                    return [[] for _ in doc_ids]
+            
+            indices = [self._find_document_index(doc_id) for doc_id in doc_ids]
+            found = [doc_index for doc_index in indices if doc_index is not None]
+            scores = self._dense_vectors[found] @ self._dense_vectors.T
+            
+            all_rows = np.arange(self._dense_vectors.shape[0])
+            results = []
+            row = 0
+            for doc_id, doc_index in zip(doc_ids, indices):
+                if doc_index is None:
+                    logger.error(f"Document {doc_id} not found")
+                    results.append([])
+                    continue
+                
+                others = all_rows != doc_index
+                results.append(self._top_matches(all_rows[others], scores[row][others], n_results, similarity_threshold))
+                row += 1
             
-            return similar_docs[:n_results]
+            return results
             
         except Exception as e:
             logger.error(f"Error finding similar documents: {e}")
-            return []
+            return [[] for _ in doc_ids]
+
+    def _top_matches(self, candidates: np.ndarray, similarities: np.ndarray, n_results: int,
+                     similarity_threshold: float) -> List[Dict[str, Any]]:
+        """Result entries for the candidates scoring at least the threshold, best first"""
+        passing = np.flatnonzero(similarities >= similarity_threshold)
+        scores = similarities[passing]
+        
+        # Keep only the top n before sorting; among equal scores the earlier candidates win
+        if 0 < n_results < passing.size:
+            kth = np.partition(scores, passing.size - n_results)[passing.size - n_results]
+            above = np.flatnonzero(scores > kth)
+            ties = np.flatnonzero(scores == kth)[:n_results - above.size]
+            selected = np.sort(np.concatenate((above, ties)))
+            passing, scores = passing[selected], scores[selected]
+        
+        # Sort by similarity score (descending)
+        order = np.argsort(-scores, kind='stable')[:n_results]
+        
+        matches = []
+        for i, similarity in zip(candidates[passing[order]].tolist(), scores[order].tolist()):
+            matches.append({
+                'document_id': self.document_metadata[i].get('doc_id', f'doc_{i}'),
+                'file_name': self.document_metadata[i].get('file_name', 'Unknown'),
+                'contract_type': self.document_metadata[i].get('contract_type', 'Unknown'),
+                'companies': self.document_metadata[i].get('companies', []),
+                'similarity_score': similarity,
+                'content_preview': self._previews[i],
+                'metadata': self.document_metadata[i]
+            })
+        
+        return matches
+
+    def _cosine_scores(self, query_vector, rows: Optional[np.ndarray] = None) -> np.ndarray:
+        """Cosine similarity of one TF-IDF row against the indexed documents (or a subset of rows)"""
+        if not SIMSIMD_AVAILABLE:
+            # Rows and queries come out of the vectorizer with unit norm
+            documents = self.document_vectors if rows is None else self.document_vectors[rows]
+            return (documents @ query_vector.T).toarray().ravel()
+        
+        documents = self._dense_vectors if rows is None else self._dense_vectors[rows]
+        dense_query = query_vector.toarray()
+        # SimSIMD treats two zero vectors as identical; an empty query matches nothing
+        if not dense_query.any():
+            return np.zeros(documents.shape[0])
+        return 1.0 - np.asarray(simsimd.cdist(dense_query, documents, metric="cosine"))[0]
+
+    def _cosine_matrix(self) -> np.ndarray:
+        """Pairwise cosine similarity of all indexed documents, as float32 (cached until the index is rebuilt)"""
+        if self._sim_matrix is None:
+            self._sim_matrix = self._dense_vectors @ self._dense_vectors.T
+            # Shared between callers, so guard it against in-place edits
+            self._sim_matrix.setflags(write=False)
+        return self._sim_matrix
 
     def _find_document_index(self, doc_id: str) -> Optional[int]:
         """Find the index of a document in the similarity index"""
-        for i, metadata in enumerate(self.document_metadata):
-            if metadata.get('doc_id') == doc_id:
-                return i
-        return None
+        return self._doc_id_to_index.get(doc_id)
 
     def _calculate_similarities(self, doc_index: int) -> np.ndarray:
         """Calculate cosine similarities for a document"""
@@ -147,7 +383,7 @@ class DocumentSimilarityDetector:
         doc_vector = self.document_vectors[doc_index]
         
         # Calculate cosine similarities with all documents
-        similarities = cosine_similarity(doc_vector, self.document_vectors).flatten()
+        similarities = self._cosine_scores(doc_vector)
         
         return similarities
 
@@ -171,33 +407,52 @@ class DocumentSimilarityDetector:
                     return []
             
             # Vectorize the query
-            query_vector = self.vectorizer.transform([self._clean_text(query)])
+            query_vector = self._vectorize_query(query)
             
             # Calculate similarities
-            similarities = cosine_similarity(query_vector, self.document_vectors).flatten()
+            similarities = self._cosine_scores(query_vector)
             
             # Get matching documents
-            matching_docs = []
-            for i, similarity in enumerate(similarities):
-                if similarity >= similarity_threshold:
-                    matching_docs.append({
-                        'document_id': self.document_metadata[i].get('doc_id', f'doc_{i}'),
-                        'file_name': self.document_metadata[i].get('file_name', 'Unknown'),
-                        'contract_type': self.document_metadata[i].get('contract_type', 'Unknown'),
-                        'companies': self.document_metadata[i].get('companies', []),
-                        'similarity_score': float(similarity),
-                        'content_preview': self.document_texts[i][:200] + "...",
-                        'metadata': self.document_metadata[i]
-                    })
+            candidates = np.arange(similarities.shape[0])
+            return self._top_matches(candidates, similarities, n_results, similarity_threshold)
             
-            # Sort by similarity score (descending)
-            matching_docs.sort(key=lambda x: x['similarity_score'], reverse=True)
+        except Exception as e:
+            logger.error(f"Error searching by content: {e}")
+            return []
+
+    def search_by_content_batch(self, queries: List[str], n_results: int = 5,
+                                similarity_threshold: float = 0.1) -> List[List[Dict[str, Any]]]:
+        """Search for several queries with one vectorizer call and one matrix product"""
+        try:
+            if self.document_vectors is None:
+                logger.warning("Similarity index not built, building now...")
+                if not self.build_similarity_index():
+                    return [[] for _ in queries]
+            
+            query_vectors = self.vectorizer.transform([self._clean_text(query) for query in queries])
+            scores = np.asarray(query_vectors @ self._dense_vectors.T)
             
-            return matching_docs[:n_results]
+            candidates = np.arange(self._dense_vectors.shape[0])
+            return [self._top_matches(candidates, row, n_results, similarity_threshold) for row in scores]
             
         except Exception as e:
             logger.error(f"Error searching by content: {e}")
-            return []
+            return [[] for _ in queries]
+
+    def _vectorize_query(self, query: str):
+        """TF-IDF row for a search query, reused for repeated queries until the index is rebuilt"""
+        with self._query_lock:
+            query_vector = self._query_vectors.get(query)
+            if query_vector is not None:
+                self._query_vectors.move_to_end(query)
+                return query_vector
+        
+        query_vector = self.vectorizer.transform([self._clean_text(query)])
+        with self._query_lock:
+            self._query_vectors[query] = query_vector
+            if len(self._query_vectors) > _QUERY_CACHE_SIZE:
+                self._query_vectors.popitem(last=False)
+        return query_vector
 
     def find_duplicate_documents(self, similarity_threshold: float = 0.9) -> List[List[Dict[str, Any]]]:
         """
@@ -216,41 +471,32 @@ class DocumentSimilarityDetector:
                     return []
             
             # Calculate similarity matrix
-            similarity_matrix = cosine_similarity(self.document_vectors)
+            similarity_matrix = self._cosine_matrix()
             
-            # Find duplicate groups
-            duplicate_groups = []
+            # All (i, j) pairs above the threshold with i < j, ordered by i then j, in one pass
+            pairs = np.argwhere(np.triu(similarity_matrix >= similarity_threshold, k=1))
+            heads, starts = np.unique(pairs[:, 0], return_index=True)
+            ends = np.append(starts[1:], len(pairs))
+            
+            # Find duplicate groups as (head, member indices); heads claim their matches in order
+            groups = []
             processed = set()
             
-            for i in range(len(similarity_matrix)):
+            for i, start, end in zip(heads.tolist(), starts.tolist(), ends.tolist()):
                 if i in processed:
                     continue
-                
-                # Find documents similar to document i
-                similar_indices = []
-                for j in range(i + 1, len(similarity_matrix)):
-                    if similarity_matrix[i][j] >= similarity_threshold:
-                        similar_indices.append(j)
-                
-                if similar_indices:
-                    # Create group with document i and similar documents
-                    group = [{
-                        'document_id': self.document_metadata[i].get('doc_id', f'doc_{i}'),
-                        'file_name': self.document_metadata[i].get('file_name', 'Unknown'),
-                        'similarity_score': 1.0
-                    }]
-                    
-                    for j in similar_indices:
-                        group.append({
-                            'document_id': self.document_metadata[j].get('doc_id', f'doc_{j}'),
-                            'file_name': self.document_metadata[j].get('file_name', 'Unknown'),
-                            'similarity_score': float(similarity_matrix[i][j])
-                        })
-                        processed.add(j)
-                    
-                    duplicate_groups.append(group)
-                
-                processed.add(i)
+                members = pairs[start:end, 1]
+                processed.update(members.tolist())
+                groups.append((i, members))
+            
+            # Materialize result entries only once the groups are settled
+            duplicate_groups = [
+                [self._duplicate_entry(i, 1.0)] + [
+                    self._duplicate_entry(j, score)
+                    for j, score in zip(members.tolist(), similarity_matrix[i, members].tolist())
+                ]
+                for i, members in groups
+            ]
             
             logger.info(f"Found {len(duplicate_groups)} potential duplicate groups")
             return duplicate_groups
@@ -259,6 +505,14 @@ class DocumentSimilarityDetector:
             logger.error(f"Error finding duplicate documents: {e}")
             return []
 
+    def _duplicate_entry(self, i: int, similarity: float) -> Dict[str, Any]:
+        """Result entry for one member of a duplicate group"""
+        return {
+            'document_id': self.document_metadata[i].get('doc_id', f'doc_{i}'),
+            'file_name': self.document_metadata[i].get('file_name', 'Unknown'),
+            'similarity_score': similarity
+        }
+
     def cluster_documents(self, n_clusters: int = 5) -> Dict[int, List[Dict[str, Any]]]:
         """
         Cluster documents based on content similarity.
@@ -275,14 +529,14 @@ class DocumentSimilarityDetector:
                 if not self.build_similarity_index():
                     return {}
             
-            # Perform K-means clustering
-            kmeans = KMeans(n_clusters=min(n_clusters, len(self.document_vectors)), 
-                           random_state=42, n_init=10)
+            # Mini-batch K-means works on the sparse rows directly; on unit rows it approximates spherical K-means
+            kmeans = MiniBatchKMeans(n_clusters=min(n_clusters, self.document_vectors.shape[0]),
+                                     random_state=42, batch_size=1024, n_init=3, max_iter=100)
             cluster_labels = kmeans.fit_predict(self.document_vectors)
             
             # Group documents by cluster
             clusters = {}
-            for i, label in enumerate(cluster_labels):
+            for i, label in enumerate(cluster_labels.tolist()):
                 if label not in clusters:
                     clusters[label] = []
                 
@@ -328,7 +582,12 @@ class DocumentSimilarityDetector:
                 logger.info(f"Found only {len(matching_docs)} documents matching '{contract_base_name}'")
                 return []
             
-            # Calculate pairwise similarities
+            # Calculate pairwise similarities with one product over the matching rows
+            similarity_matrix = None
+            if self.document_vectors is not None:
+                rows = self._dense_vectors[[doc['index'] for doc in matching_docs]]
+                similarity_matrix = (rows @ rows.T).tolist()
+            
             versions = []
             for i, doc1 in enumerate(matching_docs):
                 version_info = {
@@ -338,14 +597,10 @@ class DocumentSimilarityDetector:
                     'metadata': doc1['metadata']
                 }
                 
-                for j, doc2 in enumerate(matching_docs):
-                    if i != j:
-                        if self.document_vectors is not None:
-                            similarity = cosine_similarity(
-                                self.document_vectors[doc1['index']:doc1['index']+1],
-                                self.document_vectors[doc2['index']:doc2['index']+1]
-                            )[0][0]
-                            version_info['similarities'][doc2['file_name']] = float(similarity)
+                if similarity_matrix is not None:
+                    for j, doc2 in enumerate(matching_docs):
+                        if i != j:
+                            version_info['similarities'][doc2['file_name']] = similarity_matrix[i][j]
                 
                 versions.append(version_info)
             
@@ -365,21 +620,46 @@ class DocumentSimilarityDetector:
             if self.document_vectors is None:
                 return {"error": "Similarity index not built"}
             
-            # Calculate pairwise similarities
-            similarity_matrix = cosine_similarity(self.document_vectors)
-            
-            # Get upper triangle (excluding diagonal)
-            upper_triangle = similarity_matrix[np.triu_indices_from(similarity_matrix, k=1)]
-            
+            n_docs = self._dense_vectors.shape[0]
+            if n_docs < 2:
+                return {"error": "At least two documents are needed for similarity statistics"}
+            
+            # Reduce the upper triangle (excluding diagonal) a block of rows at a time,
+            # reusing the cached matrix when there is one instead of materializing it
+            count = high = low = 0
+            total = total_sq = 0.0
+            max_sim, min_sim = -np.inf, np.inf
+            for start in range(0, n_docs, _STATS_BLOCK_ROWS):
+                stop = min(start + _STATS_BLOCK_ROWS, n_docs)
+                if self._sim_matrix is not None:
+                    block = self._sim_matrix[start:stop, start:]
+                else:
+                    block = self._dense_vectors[start:stop] @ self._dense_vectors[start:].T
+                
+                # Columns right of the block are all above the diagonal; the square on it is not
+                rows, cols = np.triu_indices(stop - start, k=1)
+                values = np.concatenate((block[rows, cols], block[:, stop - start:].ravel())).astype(np.float64)
+                if values.size == 0:
+                    continue
+                
+                count += values.size
+                total += values.sum()
+                total_sq += np.dot(values, values)
+                max_sim = max(max_sim, values.max())
+                min_sim = min(min_sim, values.min())
+                high += int(np.count_nonzero(values > 0.8))
+                low += int(np.count_nonzero(values <= 0.5))
+            
+            mean = total / count
             stats = {
                 'total_documents': len(self.document_metadata),
-                'average_similarity': float(np.mean(upper_triangle)),
-                'max_similarity': float(np.max(upper_triangle)),
-                'min_similarity': float(np.min(upper_triangle)),
-                'std_similarity': float(np.std(upper_triangle)),
-                'high_similarity_count': int(np.sum(upper_triangle > 0.8)),
-                'medium_similarity_count': int(np.sum((upper_triangle > 0.5) & (upper_triangle <= 0.8))),
-                'low_similarity_count': int(np.sum(upper_triangle <= 0.5))
+                'average_similarity': float(mean),
+                'max_similarity': float(max_sim),
+                'min_similarity': float(min_sim),
+                'std_similarity': float(np.sqrt(max(total_sq / count - mean * mean, 0.0))),
+                'high_similarity_count': high,
+                'medium_similarity_count': count - high - low,
+                'low_similarity_count': low
             }
             
             return stats
@@ -389,27 +669,36 @@ class DocumentSimilarityDetector:
             return {"error": str(e)}
 
     def export_similarity_matrix(self, output_file: str) -> bool:
-        """Export the similarity matrix to a file"""
+        """
+        Export the similarity matrix to a file.
+        
+        The matrix is written as compressed float32 to <base>.npz, with a small JSON
+        sidecar at <base>.json holding the document names and export date.
+        """
         try:
             if self.document_vectors is None:
                 logger.error("Similarity index not built")
                 return False
             
             # Calculate similarity matrix
-            similarity_matrix = cosine_similarity(self.document_vectors)
+            similarity_matrix = self._cosine_matrix()
+            
+            base, _ = os.path.splitext(output_file)
+            matrix_file = base + '.npz'
+            np.savez_compressed(matrix_file, matrix=similarity_matrix)
             
             # Prepare data for export
             data = {
                 'document_names': [meta.get('file_name', f'doc_{i}') for i, meta in enumerate(self.document_metadata)],
-                'similarity_matrix': similarity_matrix.tolist(),
+                'matrix_file': os.path.basename(matrix_file),
                 'export_date': datetime.now().isoformat()
             }
             
             # Save to file
-            with open(output_file, 'w', encoding='utf-8') as f:
+            with open(base + '.json', 'w', encoding='utf-8') as f:
                 json.dump(data, f, indent=2)
             
-            logger.info(f"Similarity matrix exported to {output_file}")
+            logger.info(f"Similarity matrix exported to {matrix_file}")
             return True
             
         except Exception as e:
@@ -150,6 +150,64 @@ def test_workflow_engine():
         print(f"❌ Workflow engine test failed: {e}")
         return False
 
+def test_workflow_execution():
+    """Test dependency-ordered workflow execution"""
+    print("\nTesting workflow execution...")
+    
+    try:
+        from mcp_integration import CLMWorkflowEngine, WorkflowStep, WorkflowStatus
+        
+        order = []
+        
+        def make_step_function(name, delay):
+            async def step_function():
+                await asyncio.sleep(delay)
+                order.append(name)
+                return {"step": name}
+            return step_function
+        
+        async def orphan_step():
+            return {"unused": True}
+        
+        workflow_engine = CLMWorkflowEngine(None)
+        
+        # Diamond: "left" and "right" both wait on "root", "join" waits on both
+        workflow_engine.register_workflow("diamond", [
+            WorkflowStep("root", make_step_function("root", 0.01), {}),
+            WorkflowStep("left", make_step_function("left", 0.2), {}, depends_on=["root"]),
+            WorkflowStep("right", make_step_function("right", 0.2), {}, depends_on=["root"]),
+            WorkflowStep("join", make_step_function("join", 0.01), {}, depends_on=["left", "right"])
+        ])
+        
+        loop = asyncio.new_event_loop()
+        try:
+            start = loop.time()
+            result = loop.run_until_complete(workflow_engine.execute_workflow("diamond"))
+            elapsed = loop.time() - start
+            
+            assert result.status == WorkflowStatus.COMPLETED, result.error
+            assert result.steps_completed == 4
+            assert order[0] == "root" and order[-1] == "join"
+            assert elapsed < 0.35, f"independent steps did not overlap ({elapsed:.2f}s)"
+            print("✅ Independent steps ran concurrently in dependency order")
+            
+            # Missing dependencies fail the workflow without running anything
+            workflow_engine.register_workflow("broken", [
+                WorkflowStep("orphan", orphan_step, {}, depends_on=["missing"])
+            ])
+            result = loop.run_until_complete(workflow_engine.execute_workflow("broken"))
+            assert result.status == WorkflowStatus.FAILED
+            assert "missing" in result.error
+            print("✅ Missing dependency reported")
+        finally:
+            loop.close()
+        
+        return True
+    
+    except Exception as e:
+        print(f"❌ Workflow execution test failed: {e}")
+        return False
+
 def test_mcp_protocol():
     """Test MCP protocol handling"""
     print("\nTesting MCP protocol...")
@@ -178,6 +236,361 @@ def test_mcp_protocol():
         print(f"❌ MCP protocol test failed: {e}")
         return False
 
+def test_semantic_cache_negation():
+    """Test that questions differing only in a negation get separate cache entries"""
+    print("\nTesting semantic cache keys...")
+    
+    try:
+        from types import SimpleNamespace
+        from mcp_server import CLMMCPServer
+        
+        server = CLMMCPServer()
+        # No embedding model configured: only the normalized question text can match
+        server.clm_system = SimpleNamespace(rag_pipeline=SimpleNamespace(embeddings=None))
+        
+        calls = []
+        
+        def lookup(question):
+            def compute():
+                calls.append(question)
+                return {"answer": f"answer to {question}"}
+            return server._semantic_lookup("ask_question", question, 0, compute)
+        
+        loop = asyncio.new_event_loop()
+        try:
+            expiring = loop.run_until_complete(lookup("Which contracts are expiring?"))
+            not_expiring = loop.run_until_complete(lookup("Which contracts are not expiring?"))
+            assert expiring != not_expiring
+            assert len(calls) == 2
+            print("✅ Negated question computed its own answer")
+            
+            repeat = loop.run_until_complete(lookup("  which CONTRACTS are   expiring? "))
+            assert repeat == expiring and len(calls) == 2
+            print("✅ Same question with different case and spacing served from cache")
+        finally:
+            loop.run_until_complete(server._embedder.aclose())
+            loop.close()
+        
+        return True
+        
+    except Exception as e:
+        print(f"❌ Semantic cache test failed: {e}")
+        return False
+
+def test_framed_round_trip():
+    """Test a tools/list request and response over length-prefixed framing"""
+    print("\nTesting length-prefixed framing...")
+    
+    try:
+        import io
+        import json
+        import mcp_server
+        from types import SimpleNamespace
+        from mcp_server import CLMMCPServer, MCPProtocol
+        
+        protocol = MCPProtocol(CLMMCPServer())
+        framed = mcp_server._LENGTH_PREFIXED
+        stdout = sys.stdout
+        mcp_server._LENGTH_PREFIXED = True
+        
+        async def round_trip(payload: bytes) -> list:
+            reader = asyncio.StreamReader()
+            reader.feed_data(payload)
+            reader.feed_eof()
+            return [body async for body in mcp_server._read_frames(reader)]
+        
+        loop = asyncio.new_event_loop()
+        try:
+            # Client side: frame a request the way the server frames its responses
+            requests = io.BytesIO()
+            sys.stdout = SimpleNamespace(buffer=requests)
+            mcp_server._write_frame(json.dumps({"jsonrpc": "2.0", "method": "tools/list", "id": 5}).encode())
+            
+            # Server side: read the frame back, answer it, and frame the response
+            bodies = loop.run_until_complete(round_trip(requests.getvalue()))
+            assert len(bodies) == 1
+            responses = io.BytesIO()
+            sys.stdout = SimpleNamespace(buffer=responses)
+            loop.run_until_complete(mcp_server._handle_request(protocol, bodies[0]))
+        finally:
+            sys.stdout = stdout
+            mcp_server._LENGTH_PREFIXED = framed
+            loop.run_until_complete(protocol.server._embedder.aclose())
+            loop.close()
+        
+        loop = asyncio.new_event_loop()
+        try:
+            bodies = loop.run_until_complete(round_trip(responses.getvalue()))
+        finally:
+            loop.close()
+        
+        response = json.loads(bodies[0])
+        assert response["id"] == 5
+        assert {tool["name"] for tool in response["result"]["tools"]} == set(protocol.server.tools)
+        print("✅ Framed request and response round-tripped")
+        
+        return True
+        
+    except Exception as e:
+        print(f"❌ Framing test failed: {e}")
+        return False
+
+def test_oversized_requests():
+    """Test that unreadable requests are reported and reading continues"""
+    print("\nTesting oversized and truncated requests...")
+    
+    try:
+        import io
+        import mcp_server
+        
+        async def collect(requests) -> list:
+            return [body async for body in requests]
+        
+        def stream(payload: bytes, limit: int) -> asyncio.StreamReader:
+            reader = asyncio.StreamReader(limit=limit)
+            reader.feed_data(payload)
+            reader.feed_eof()
+            return reader
+        
+        framed = mcp_server._LENGTH_PREFIXED
+        max_bytes = mcp_server._MAX_LINE_BYTES
+        mcp_server._MAX_LINE_BYTES = 16
+        loop = asyncio.new_event_loop()
+        try:
+            lines = b'{"id":1}\n' + b"x" * 100 + b'\n{"id":2}\n'
+            for requests in (
+                mcp_server._read_lines(stream(lines, 16)),
+                mcp_server._read_blocking(io.BytesIO(lines))
+            ):
+                mcp_server._LENGTH_PREFIXED = False
+                bodies = loop.run_until_complete(collect(requests))
+                assert [type(body) for body in bodies] == [bytes, ValueError, bytes]
+                assert bodies[2].strip() == b'{"id":2}'
+            print("✅ Oversized line skipped and the next one read")
+            
+            header = mcp_server._FRAME_HEADER.pack
+            frames = header(8) + b'{"id":1}' + header(100) + b"x" * 100 + header(8) + b'{"id":2}' + header(50) + b"short"
+            for requests in (
+                mcp_server._read_frames(stream(frames, 16)),
+                mcp_server._read_blocking(io.BytesIO(frames))
+            ):
+                mcp_server._LENGTH_PREFIXED = True
+                bodies = loop.run_until_complete(collect(requests))
+                assert [type(body) for body in bodies] == [bytes, ValueError, bytes, ValueError]
+                assert bodies[2] == b'{"id":2}'
+            print("✅ Oversized and truncated frames reported")
+        finally:
+            mcp_server._LENGTH_PREFIXED = framed
+            mcp_server._MAX_LINE_BYTES = max_bytes
+            loop.close()
+        
+        return True
+        
+    except Exception as e:
+        print(f"❌ Oversized request test failed: {e}")
+        return False
+
+def test_batch_execute():
+    """Test a batch_execute request through the protocol handler"""
+    print("\nTesting batch execution...")
+    
+    try:
+        import json
+        from types import SimpleNamespace
+        from mcp_server import CLMMCPServer, MCPProtocol
+        
+        server = CLMMCPServer()
+        server.clm_system = SimpleNamespace(get_system_status=lambda: {"status": "ok", "total_documents": 3})
+        protocol = MCPProtocol(server)
+        
+        request = {
+            "jsonrpc": "2.0",
+            "method": "tools/call",
+            "id": 9,
+            "params": {
+                "name": "batch_execute",
+                "arguments": {
+                    "operations": [
+                        {"tool": "get_system_status"},
+                        {"tool": "no_such_tool"},
+                        {"tool": "get_system_status", "arguments": {}}
+                    ],
+                    "maxConcurrent": 2
+                }
+            }
+        }
+        
+        loop = asyncio.new_event_loop()
+        try:
+            response = json.loads(loop.run_until_complete(protocol.handle_request_bytes(request)))
+        finally:
+            loop.run_until_complete(server._embedder.aclose())
+            loop.close()
+        
+        result = response["result"]
+        assert response["id"] == 9
+        assert result["count"] == 3 and result["failed"] == 1
+        assert [entry["success"] for entry in result["results"]] == [True, False, True]
+        assert result["results"][0]["result"]["total_documents"] == 3
+        print("✅ Batch results returned in order with failures reported")
+        
+        return True
+        
+    except Exception as e:
+        print(f"❌ Batch execution test failed: {e}")
+        return False
+
+def test_argument_types():
+    """Test that mistyped tool arguments are rejected with and without msgspec"""
+    print("\nTesting argument type checks...")
+    
+    try:
+        import mcp_server
+        from types import SimpleNamespace
+        from mcp_server import CLMMCPServer
+        
+        server = CLMMCPServer()
+        server.clm_system = SimpleNamespace()
+        mistyped = [
+            ("ask_question", {"question": "Which contracts expire?", "max_results": "5"}),
+            ("process_documents", {"num_workers": True}),
+            ("search_documents", {"query": 42}),
+            ("batch_execute", {"operations": ["get_system_status"]})
+        ]
+        
+        convert = mcp_server._convert_args
+        loop = asyncio.new_event_loop()
+        try:
+            for converter in (convert, mcp_server._convert_args_plain):
+                mcp_server._convert_args = converter
+                for tool_name, arguments in mistyped:
+                    result = loop.run_until_complete(server.call_tool(tool_name, arguments))
+                    assert result["error"].startswith(f"Invalid arguments for {tool_name}"), result
+        finally:
+            mcp_server._convert_args = convert
+            loop.close()
+        print("✅ Mistyped arguments reported as invalid")
+        
+        args = mcp_server._convert_args_plain({"num_workers": None, "batch_size": 8, "extra": 1},
+                                              mcp_server.ProcessDocumentsArgs)
+        assert args.num_workers is None and args.batch_size == 8
+        print("✅ Well-typed arguments accepted and unknown keys ignored")
+        
+        return True
+        
+    except Exception as e:
+        print(f"❌ Argument type test failed: {e}")
+        return False
+
+def test_semantic_cache_threshold():
+    """Test semantic cache hits and misses around the similarity threshold"""
+    print("\nTesting semantic cache threshold...")
+    
+    try:
+        import numpy as np
+        from mcp_server import SemanticCache
+        
+        cache = SemanticCache(4, capacity=8, tau=0.95)
+        cache.put(np.array([1.0, 0.0, 0.0, 0.0]), "cached")
+        
+        # Cosine 0.98 clears the threshold, 0.93 does not
+        assert cache.get(np.array([1.0, 0.2, 0.0, 0.0])) == "cached"
+        assert cache.get(np.array([1.0, 0.4, 0.0, 0.0])) is None
+        assert cache.get(np.zeros(4)) is None
+        print("✅ Hit above and miss below the threshold")
+        
+        return True
+        
+    except Exception as e:
+        print(f"❌ Semantic cache threshold test failed: {e}")
+        return False
+
+def test_answer_cache():
+    """Test answer cache invalidation and int8 re-ranking"""
+    print("\nTesting answer cache...")
+    
+    try:
+        import numpy as np
+        from types import SimpleNamespace
+        from config import Config
+        from rag_pipeline import AnswerCache, RAGPipeline
+        
+        # Cached answers are dropped once the document processor reindexes
+        processor = SimpleNamespace(version=0)
+        rag = RAGPipeline(Config(), processor)
+        key = rag._answer_cache_key("When does the contract expire?", 5)
+        rag.answer_cache.put(key, {"answer": "cached"})
+        assert rag.answer_cache.get(rag._answer_cache_key(" when does the contract expire? ", 5)) is not None
+        processor.version += 1
+        assert rag.answer_cache.get(rag._answer_cache_key("When does the contract expire?", 5)) is None
+        print("✅ Cache cleared on document processor version bump")
+        
+        # The int8 shortlist is re-scored, so neighbours come back in exact cosine order
+        rng = np.random.default_rng(7)
+        embeddings = rng.standard_normal((200, 64)).astype(np.float32)
+        embeddings /= np.linalg.norm(embeddings, axis=1, keepdims=True)
+        cache = AnswerCache(capacity=256)
+        for i, embedding in enumerate(embeddings):
+            cache.put((f"question {i}", 5), {"answer": i}, embedding)
+        
+        query = embeddings[0] + 0.5 * embeddings[1]
+        query /= np.linalg.norm(query)
+        exact = embeddings.astype(np.float16).astype(np.float32) @ query
+        expected = [(f"question {i}", 5) for i in np.argsort(-exact)[:5]]
+        nearest = cache.k_nearest(query, 5)
+        assert [match for match, _ in nearest] == expected
+        assert all(a[1] >= b[1] for a, b in zip(nearest, nearest[1:]))
+        print("✅ Nearest cached questions returned in exact order")
+        
+        return True
+        
+    except Exception as e:
+        print(f"❌ Answer cache test failed: {e}")
+        return False
+
+def test_semantic_cache_persistence():
+    """Test that saved semantic caches only load for the same corpus"""
+    print("\nTesting semantic cache persistence...")
+    
+    try:
+        import tempfile
+        import numpy as np
+        from types import SimpleNamespace
+        from mcp_server import CLMMCPServer, SemanticCache
+        
+        def make_server(doc_ids):
+            server = CLMMCPServer()
+            server.config.SEMANTIC_CACHE_DIRECTORY = directory
+            detector = SimpleNamespace(
+                document_vectors=np.zeros((len(doc_ids), 4)),
+                document_metadata=[{"doc_id": doc_id} for doc_id in doc_ids]
+            )
+            server.clm_system = SimpleNamespace(similarity_detector=detector)
+            return server
+        
+        with tempfile.TemporaryDirectory() as directory:
+            server = make_server(["a", "b", "c"])
+            cache = server._semantic_caches[("ask_question", 0)] = SemanticCache(4, capacity=8)
+            cache.put(np.array([1.0, 0.0, 0.0, 0.0]), {"answer": "saved"})
+            server.save_semantic_cache()
+            
+            changed = make_server(["a", "b", "d"])
+            changed.load_semantic_cache()
+            assert not changed._semantic_caches
+            print("✅ Cache for a different corpus ignored")
+            
+            same = make_server(["a", "b", "c"])
+            same.load_semantic_cache()
+            restored = same._semantic_caches[("ask_question", 0)]
+            assert restored.get(np.array([1.0, 0.0, 0.0, 0.0])) == {"answer": "saved"}
+            print("✅ Cache for the same corpus restored")
+        
+        return True
+        
+    except Exception as e:
+        print(f"❌ Semantic cache persistence test failed: {e}")
+        return False
+
 def test_example_imports():
     """Test that examples can be imported"""
     print("\nTesting example imports...")
@@ -206,7 +619,16 @@ def run_all_tests():
         ("Configuration Tests", test_configuration),
         ("MCP Server Tests", test_mcp_server_initialization),
         ("Workflow Engine Tests", test_workflow_engine),
+        ("Workflow Execution Tests", test_workflow_execution),
         ("MCP Protocol Tests", test_mcp_protocol),
+        ("Semantic Cache Tests", test_semantic_cache_negation),
+        ("Framing Tests", test_framed_round_trip),
+        ("Oversized Request Tests", test_oversized_requests),
+        ("Batch Execute Tests", test_batch_execute),
+        ("Argument Type Tests", test_argument_types),
+        ("Semantic Cache Threshold Tests", test_semantic_cache_threshold),
+        ("Answer Cache Tests", test_answer_cache),
+        ("Semantic Cache Persistence Tests", test_semantic_cache_persistence),
         ("Example Tests", test_example_imports)
     ]
     